@@ -0,0 +1,72 @@
+"""Cold archive: archived tasks live in their own table.
+
+`task` holds only active tasks, so the hot paths (index, table editor,
+calendar, workload) scan and cache just the working set, while
+`archived_task` has the same columns plus indexes for the archive views.
+Archiving or unarchiving moves rows between the two with INSERT ... SELECT
+and DELETE in the caller's transaction. Ids come from the `task`
+AUTOINCREMENT sequence and survive the move; task_member rows stay put.
+
+The triggers on both tables (search index, tombstones) treat a row whose
+id exists in the other table as moved rather than created or deleted: the
+search index entry is kept and no tombstone is written.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, insert, delete, literal, text
+
+from models import Task, ArchivedTask
+from changes import mark_changed
+
+TASK_MODELS = (Task, ArchivedTask)
+TASK_COLUMN_NAMES = [column.name for column in Task.__table__.columns]
+
+
+def task_model(archived):
+    """The table holding tasks in this archive state"""
+    return ArchivedTask if archived else Task
+
+
+def get_task(session, task_id):
+    """The task with this id, active or archived, or None"""
+    return session.get(Task, task_id) or session.get(ArchivedTask, task_id)
+
+
+def move_tasks(session, ids, archive):
+    """Move tasks into (archive=True) or out of the archive; returns the ids moved"""
+    ids = list(ids)
+    if not ids:
+        return []
+    source, target = task_model(not archive), task_model(archive)
+    # Pending ORM changes to these rows must land before they are copied
+    session.flush()
+
+    overrides = {
+        'is_archived': literal(archive),
+        'updated_at': literal(datetime.utcnow(), Task.updated_at.type),  # Differential backups
+    }
+    columns = [overrides.get(name, source.__table__.c[name]) for name in TASK_COLUMN_NAMES]
+    moved = session.execute(
+        insert(target.__table__)
+        .from_select(TASK_COLUMN_NAMES, select(*columns).where(source.id.in_(ids)))
+        .returning(target.__table__.c.id)
+    ).scalars().all()
+    if moved:
+        # ORM-enabled delete: loaded instances of the moved rows are dropped too
+        session.execute(delete(source).where(source.id.in_(moved)))
+        mark_changed(session, 'tasks', 'update', moved)
+    return moved
+
+
+def reserve_task_ids(session, max_id):
+    """Keep the task id sequence past max_id (rows written straight into the archive)"""
+    if max_id is None:
+        return
+    session.execute(text(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'task', 0 "
+        "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'task')"
+    ))
+    session.execute(
+        text("UPDATE sqlite_sequence SET seq = :max_id WHERE name = 'task' AND seq < :max_id"),
+        {'max_id': max_id}
+    )
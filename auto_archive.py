@@ -0,0 +1,162 @@
+"""Scheduled archiving of the tasks matching configured rules.
+
+    AUTO_ARCHIVE_RULES='[{"status": "status-done", "idle_days": 30}]'
+
+Each rule is a bulk archive filter (see bulk_archive.parse_filter); the
+default archives tasks that are done and were not edited for 30 days.
+A run moves the matching active tasks into the archive in batches of
+AUTO_ARCHIVE_BATCH_SIZE, one short transaction per batch and a pause of
+AUTO_ARCHIVE_BATCH_PAUSE seconds in between, so the SQLite write lock is
+only held for a few milliseconds at a time while a large backlog drains.
+Every run is recorded as an 'auto_archive' job (GET /api/jobs?kind=auto_archive)
+with the tasks moved per rule and the longest batch, and logged.
+
+Runs come from cron (`flask auto-archive`) or from the in-process scheduler:
+with AUTO_ARCHIVE_INTERVAL (seconds) set, every worker starts a scheduler
+thread. A worker runs the rules only after claiming the `scheduler_lease`
+row, which is held until the next run is due, so one worker per interval
+runs them and the others skip. A running worker extends the lease with
+every batch, so a run longer than the interval keeps it; a run that finds
+its lease taken stops.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, update
+
+from models import db, Job, SchedulerLease
+from database import setting
+from bulk_archive import BulkArchiveError, parse_filter, set_archived
+
+DEFAULT_RULES = [{'status': 'status-done', 'idle_days': 30}]
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_PAUSE = 0.2  # seconds between batches, for other writers
+SCHEDULER_POLL = 60  # seconds between lease checks
+LEASE_NAME = 'auto_archive'
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def archive_rules(config):
+    """Validated rules from AUTO_ARCHIVE_RULES (a list of filters, or its JSON)"""
+    rules = setting(config, 'AUTO_ARCHIVE_RULES', DEFAULT_RULES)
+    if isinstance(rules, str):
+        try:
+            rules = json.loads(rules)
+        except ValueError:
+            raise BulkArchiveError('AUTO_ARCHIVE_RULES must be a JSON list of filters')
+    if not isinstance(rules, list):
+        raise BulkArchiveError('AUTO_ARCHIVE_RULES must be a list of filters')
+    return [parse_filter(rule) for rule in rules]
+
+
+class LeaseLost(RuntimeError):
+    pass
+
+
+def run_auto_archive(app, lease=None):
+    """Archive everything the rules match, batch by batch; returns the job as a dict.
+
+    lease: (owner, duration) of the scheduler lease to extend with each batch
+    """
+    with app.app_context():
+        session = db.session
+        batch_size = int(setting(app.config, 'AUTO_ARCHIVE_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+        pause = float(setting(app.config, 'AUTO_ARCHIVE_BATCH_PAUSE', DEFAULT_BATCH_PAUSE))
+        rules = archive_rules(app.config)
+        moved = [0] * len(rules)
+        longest = 0.0
+
+        job = Job(kind='auto_archive', params=json.dumps({'rules': rules}))
+        session.add(job)
+        session.commit()
+        try:
+            for index, rule in enumerate(rules):
+                while True:
+                    started = time.perf_counter()
+                    ids = set_archived(session, rule, True, limit=batch_size)
+                    job.done += len(ids)
+                    if lease and not extend_lease(session, LEASE_NAME, *lease):
+                        raise LeaseLost('Another worker took over the scheduler lease')
+                    session.commit()
+                    longest = max(longest, time.perf_counter() - started)
+                    moved[index] += len(ids)
+                    if len(ids) < batch_size:
+                        break
+                    time.sleep(pause)
+            job.status = 'done'
+        except Exception as e:
+            session.rollback()
+            app.logger.exception('Auto-archive job %s failed', job.id)
+            job.status = 'failed'
+            job.error = str(e)
+
+        job.total = job.done
+        job.params = json.dumps({'rules': rules, 'moved': moved, 'max_batch_ms': round(longest * 1000, 1)})
+        job.finished_at = datetime.utcnow()
+        session.commit()
+        app.logger.info('Auto-archive moved %d tasks (per rule: %s), longest batch %.1f ms',
+                        job.done, moved, longest * 1000)
+        return job.to_dict()
+
+
+def claim_lease(session, name, owner, duration):
+    """Take the named lease for `duration` if it is free or expired; True if taken"""
+    now = datetime.utcnow()
+    lease = SchedulerLease.__table__
+    values = {'owner': owner, 'expires_at': now + duration}
+    # Both statements only write when the lease is up for grabs, and SQLite
+    # serializes writers, so exactly one worker gets it
+    claimed = session.execute(insert(lease).prefix_with('OR IGNORE').values(name=name, **values)).rowcount
+    if not claimed:
+        claimed = session.execute(
+            update(lease).where(lease.c.name == name, lease.c.expires_at <= now).values(**values)
+        ).rowcount
+    session.commit()
+    return bool(claimed)
+
+
+def extend_lease(session, name, owner, duration):
+    """Keep a held lease until now + duration, in the caller's transaction; False if not held"""
+    lease = SchedulerLease.__table__
+    return bool(session.execute(
+        update(lease).where(lease.c.name == name, lease.c.owner == owner)
+        .values(expires_at=datetime.utcnow() + duration)
+    ).rowcount)
+
+
+def start_scheduler(app):
+    """Start this process's scheduler thread if AUTO_ARCHIVE_INTERVAL is set; returns it"""
+    global _scheduler
+    interval = int(setting(app.config, 'AUTO_ARCHIVE_INTERVAL', 0))
+    if interval <= 0:
+        return None
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = threading.Thread(
+                target=_schedule, args=(app, interval), name='auto-archive-scheduler', daemon=True
+            )
+            _scheduler.start()
+    return _scheduler
+
+
+def _schedule(app, interval):
+    owner = f'{socket.gethostname()}:{os.getpid()}'
+    duration = timedelta(seconds=interval)
+    while True:
+        with app.app_context():
+            try:
+                if claim_lease(db.session, LEASE_NAME, owner, duration):
+                    run_auto_archive(app, lease=(owner, duration))
+                    # The next run is due one interval after this one finished
+                    extend_lease(db.session, LEASE_NAME, owner, duration)
+                    db.session.commit()
+            except Exception:
+                app.logger.exception('Auto-archive scheduler run failed')
+                db.session.rollback()
+        time.sleep(min(interval, SCHEDULER_POLL))
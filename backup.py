@@ -0,0 +1,724 @@
+"""Streaming backup export and bulk restore.
+
+Rows are read in chunks with `yield_per` and serialized straight into the
+response, so memory stays flat no matter how large a table (or the whole
+system) is. Two formats are produced:
+
+- json: the original `{table, timestamp, data, count}` document, streamed.
+  For 'all', data is `{table_name: [rows]}`; otherwise a list of rows.
+- ndjson: one JSON object per line. A header line
+  `{"table", "timestamp", "format": "ndjson"}`, then one
+  `{"table": name, "row": {...}}` line per record, then a trailer
+  `{"end": true, "count": n, "counts": {...}}`. A file without its trailer
+  was truncated.
+
+Either format can be gzip-compressed on the fly.
+
+Restores read the upload incrementally (either format, gzipped or not, plus
+bare row lists), validate every record and write bounded batches with
+`INSERT ... ON CONFLICT DO UPDATE`. The whole restore is one transaction:
+any invalid record rolls everything back.
+"""
+import gzip
+import io
+import json
+import re
+import time
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, insert, text
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import db, Team, TeamMember, Task, ArchivedTask, TaskMember, SpecialDay, Tombstone, split_members
+from changes import mark_changed
+from archive import move_tasks, reserve_task_ids
+
+# Export order; restores insert in this order so references resolve
+BACKUP_MODELS = {
+    'teams': Team,
+    'members': TeamMember,
+    'tasks': Task,
+    'special_days': SpecialDay
+}
+
+# Tables stored in more than one database table: archived tasks live in
+# archived_task (see archive.py) and are backed up as 'tasks' rows
+ARCHIVE_MODELS = {'tasks': ArchivedTask}
+
+
+def table_models(table):
+    """Models holding the rows of a backup table"""
+    return [BACKUP_MODELS[table]] + ([ARCHIVE_MODELS[table]] if table in ARCHIVE_MODELS else [])
+
+EXPORT_FORMATS = ('json', 'ndjson')
+CHUNK_SIZE = 500
+
+# Differential backups: deletes are remembered this long, so a diff can
+# only start from a backup younger than that (take a full backup at least
+# this often). The overlap re-exports rows written just before the base
+# backup id, covering transactions that were still committing.
+TOMBSTONE_RETENTION = timedelta(days=35)
+DIFF_OVERLAP = timedelta(minutes=1)
+
+
+def backup_tables(table_name):
+    """Tables covered by a backup of table_name, or None if it is unknown"""
+    if table_name == 'all':
+        return list(BACKUP_MODELS)
+    if table_name in BACKUP_MODELS:
+        return [table_name]
+    return None
+
+
+def parse_backup_id(value):
+    """Parse a backup id (ISO timestamp) or a Unix timestamp into UTC"""
+    try:
+        return datetime.utcfromtimestamp(float(value))
+    except ValueError:
+        return datetime.fromisoformat(value)
+
+
+def iter_rows(table, since=None, chunk_size=CHUNK_SIZE):
+    """Yield to_dict() rows of a table, loading chunk_size rows at a time.
+
+    With since, only rows written at or after it. The session's identity
+    map only holds weak references, so each chunk of records is released
+    once it has been serialized.
+    """
+    for model in table_models(table):
+        query = select(model).order_by(model.id).execution_options(yield_per=chunk_size)
+        if since is not None:
+            query = query.where(model.updated_at >= since)
+        result = db.session.execute(query)
+        for partition in result.scalars().partitions():
+            for record in partition:
+                yield record.to_dict()
+
+
+def iter_deleted(table, since):
+    """Yield ids of rows deleted at or after since (and not re-created)"""
+    query = select(Tombstone.row_id).distinct() \
+        .where(Tombstone.table_name == table, Tombstone.deleted_at >= since)
+    for model in table_models(table):
+        query = query.where(Tombstone.row_id.notin_(select(model.id)))
+    query = query.order_by(Tombstone.row_id)
+    return db.session.execute(query.execution_options(yield_per=CHUNK_SIZE)).scalars()
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _header(table_name, since):
+    header = {'table': table_name, 'timestamp': time.time(), 'backup_id': datetime.utcnow().isoformat()}
+    if since is not None:
+        header['since'] = since.isoformat()
+    return header
+
+
+def _json_list(items):
+    yield '['
+    count = 0
+    for item in items:
+        yield (', ' if count else '') + _dumps(item)
+        count += 1
+    yield ']'
+    return count
+
+
+def _json_chunks(table_name, tables, since):
+    counts = {}
+    header = _header(table_name, since)
+    # Reading starts after backup_id is taken; overlap covers writes that
+    # were in flight at that moment
+    since = since - DIFF_OVERLAP if since is not None else None
+    yield _dumps(header)[:-1] + ', "data": '
+    if table_name == 'all':
+        yield '{'
+    for i, table in enumerate(tables):
+        if table_name == 'all':
+            yield '%s%s: ' % (', ' if i else '', _dumps(table))
+        counts[table] = yield from _json_list(iter_rows(table, since))
+    if table_name == 'all':
+        yield '}'
+    if since is not None:
+        yield ', "deleted": '
+        if table_name == 'all':
+            yield '{'
+        for i, table in enumerate(tables):
+            if table_name == 'all':
+                yield '%s%s: ' % (', ' if i else '', _dumps(table))
+            yield from _json_list(iter_deleted(table, since))
+        if table_name == 'all':
+            yield '}'
+    yield ', "count": %d}' % sum(counts.values())
+
+
+def _ndjson_chunks(table_name, tables, since):
+    counts, deleted = {}, {}
+    yield _dumps(dict(_header(table_name, since), format='ndjson')) + '\n'
+    since = since - DIFF_OVERLAP if since is not None else None
+    for table in tables:
+        count = 0
+        for row in iter_rows(table, since):
+            yield _dumps({'table': table, 'row': row}) + '\n'
+            count += 1
+        counts[table] = count
+    if since is not None:
+        for table in tables:
+            count = 0
+            for row_id in iter_deleted(table, since):
+                yield _dumps({'table': table, 'delete': row_id}) + '\n'
+                count += 1
+            deleted[table] = count
+    trailer = {'end': True, 'count': sum(counts.values()), 'counts': counts}
+    if since is not None:
+        trailer['deleted'] = deleted
+    yield _dumps(trailer) + '\n'
+
+
+def _buffered(chunks, size=64 * 1024):
+    """Join small string chunks into ~size byte blocks"""
+    buffer, length = [], 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        buffer.append(data)
+        length += len(data)
+        if length >= size:
+            yield b''.join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def _gzipped(blocks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for block in blocks:
+        data = compressor.compress(block)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(table_name, fmt='json', compress=False, since=None):
+    """Generator of response body bytes for a backup of table_name.
+
+    With since (a datetime), a differential backup: rows written and ids
+    deleted since then.
+    """
+    tables = backup_tables(table_name)
+    chunks = (_ndjson_chunks if fmt == 'ndjson' else _json_chunks)(table_name, tables, since)
+    blocks = _buffered(chunks)
+    return _gzipped(blocks) if compress else blocks
+
+
+def export_filename(table_name, fmt='json', compress=False, since=None):
+    kind = 'diff' if since is not None else 'backup'
+    return f'{kind}_{table_name}_{int(time.time())}.{fmt}' + ('.gz' if compress else '')
+
+
+def init_tombstones(conn):
+    """Create the triggers recording deleted rows.
+
+    A task deleted from one task table while its id exists in the other one
+    was moved (archived or unarchived), not deleted.
+    """
+    for table in BACKUP_MODELS:
+        models = table_models(table)
+        for model in models:
+            moved = ' AND '.join(
+                f'NOT EXISTS (SELECT 1 FROM {other.__tablename__} WHERE id = old.id)'
+                for other in models if other is not model
+            )
+            conn.execute(text(
+                f'CREATE TRIGGER IF NOT EXISTS {model.__tablename__}_tombstone AFTER DELETE ON {model.__tablename__} '
+                + (f'WHEN {moved} ' if moved else '') + 'BEGIN '
+                f"INSERT INTO tombstone (table_name, row_id, deleted_at) "
+                f"VALUES ('{table}', old.id, strftime('%Y-%m-%d %H:%M:%f000', 'now')); "
+                f'END'
+            ))
+
+
+def prune_tombstones(session, retention=TOMBSTONE_RETENTION):
+    """Drop tombstones older than the retention window; returns the count"""
+    result = session.execute(
+        delete(Tombstone).where(Tombstone.deleted_at < datetime.utcnow() - retention)
+    )
+    return result.rowcount
+
+
+def diff_horizon():
+    """Oldest point a differential backup can start from"""
+    return datetime.utcnow() - TOMBSTONE_RETENTION
+
+
+# ============ RESTORE ============
+
+RESTORE_BATCH_SIZE = 500
+READ_SIZE = 64 * 1024
+
+REQUIRED_FIELDS = {
+    'teams': ['name_en', 'name_he'],
+    'members': ['name_en', 'name_he', 'team_id'],
+    'tasks': ['project', 'task', 'status'],
+    'special_days': ['date', 'name']
+}
+
+_WHITESPACE = re.compile(r'\s*')
+_decoder = json.JSONDecoder()
+
+
+class RestoreError(ValueError):
+    """The backup file or one of its records is invalid"""
+
+
+def open_backup(stream):
+    """Text reader over an uploaded backup, gunzipping when needed"""
+    magic = stream.read(2)
+    stream.seek(0)
+    if magic == b'\x1f\x8b':
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    return io.TextIOWrapper(stream, encoding='utf-8-sig')
+
+
+class _JsonReader:
+    """Pull parser reading one JSON value at a time from a text stream.
+
+    Only the current value (one record) and a read-ahead block are held in
+    memory, whatever the size of the file.
+    """
+
+    def __init__(self, text):
+        self._text = text
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self):
+        chunk = '' if self._eof else self._text.read(READ_SIZE)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        char = self.peek()
+        if not char or char not in chars:
+            raise RestoreError(f'Invalid backup file: expected one of {chars!r}, found {char!r}')
+        self._pos += 1
+        return char
+
+    def value(self):
+        if not self.peek():
+            raise RestoreError('Invalid backup file: unexpected end of file')
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise RestoreError('Invalid backup file: malformed JSON')
+            # A number ending exactly at the buffer end may continue in the next block
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def items(self):
+        """Yield the elements of an array whose '[' was just consumed"""
+        if self.peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+    def keys(self):
+        """Yield the keys of an object whose '{' was just consumed.
+
+        The caller must consume each key's value before asking for the next.
+        """
+        if self.peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise RestoreError('Invalid backup file: object key expected')
+            self.expect(':')
+            yield key
+            if self.expect(',}') == '}':
+                return
+
+
+def read_backup(text):
+    """Parse a backup incrementally into events.
+
+    Yields ('header', key, value) for metadata, ('scope', 'all'|'single',
+    None) once the kind of backup is known, ('row', table, record) per
+    record and ('delete', table, id) per deleted id (table is None in
+    single table backups), and ('end', None, trailer) for NDJSON files.
+    """
+    reader = _JsonReader(text)
+    first = reader.peek()
+    if first == '[':
+        # Bare list of rows
+        reader.expect('[')
+        yield 'scope', 'single', None
+        for record in reader.items():
+            yield 'row', None, record
+        return
+    reader.expect('{')
+
+    header = {}
+    for key in reader.keys():
+        if key == 'deleted':
+            # Differential backups: ids deleted since the base backup
+            if reader.peek() == '[':
+                reader.expect('[')
+                for row_id in reader.items():
+                    yield 'delete', None, row_id
+            else:
+                reader.expect('{')
+                for table in reader.keys():
+                    reader.expect('[')
+                    for row_id in reader.items():
+                        yield 'delete', table, row_id
+            continue
+        if key != 'data':
+            header[key] = reader.value()
+            yield 'header', key, header[key]
+            continue
+        if reader.peek() == '[':
+            reader.expect('[')
+            yield 'scope', 'single', None
+            for record in reader.items():
+                yield 'row', None, record
+        elif reader.peek() == '{':
+            reader.expect('{')
+            yield 'scope', 'all', None
+            for table in reader.keys():
+                reader.expect('[')
+                for record in reader.items():
+                    yield 'row', table, record
+        else:
+            reader.value()
+
+    if header.get('format') != 'ndjson':
+        return
+
+    scope = 'all' if header.get('table') == 'all' else 'single'
+    yield 'scope', scope, None
+    while reader.peek():
+        line = reader.value()
+        if not isinstance(line, dict):
+            raise RestoreError('Invalid backup file: NDJSON lines must be objects')
+        if line.get('end'):
+            yield 'end', None, line
+            return
+        table = line.get('table')
+        if scope == 'single':
+            if table != header.get('table'):
+                raise RestoreError(f'Invalid backup file: "{table}" row in a "{header.get("table")}" backup')
+            table = None
+        if 'delete' in line:
+            yield 'delete', table, line['delete']
+        else:
+            yield 'row', table, line.get('row')
+    raise RestoreError('Backup file is incomplete (missing end marker)')
+
+
+def _parse_date(value):
+    if not value:
+        return None
+    if not isinstance(value, str):
+        raise ValueError(value)
+    return datetime.fromisoformat(value).date()
+
+
+def clean_record(table, item, number):
+    """Validate one backup record and convert it to column values"""
+    where = f'{table} record {number}'
+    if not isinstance(item, dict):
+        raise RestoreError(f'Invalid {where}: expected an object')
+    for field in REQUIRED_FIELDS[table]:
+        if item.get(field) is None:
+            raise RestoreError(f'Missing field "{field}" in {where}')
+
+    columns = BACKUP_MODELS[table].__table__.columns.keys()
+    record = {k: v for k, v in item.items() if k in columns}
+
+    if record.get('id') is None:
+        record.pop('id', None)
+    elif not isinstance(record['id'], int) or isinstance(record['id'], bool):
+        raise RestoreError(f'Invalid id in {where}')
+
+    if table == 'members' and not isinstance(record['team_id'], int):
+        raise RestoreError(f'Invalid team_id in {where}')
+
+    if table == 'tasks':
+        # Convert members list to string if needed
+        if isinstance(record.get('members'), list):
+            record['members'] = ','.join(record['members'])
+        if 'members' in record and not isinstance(record['members'], str):
+            raise RestoreError(f'Invalid members in {where}')
+        for date_field in ('start_date', 'end_date'):
+            if date_field in record:
+                try:
+                    record[date_field] = _parse_date(record[date_field])
+                except ValueError:
+                    record[date_field] = None
+        if record.get('edited_at') is None:
+            record.pop('edited_at', None)
+        else:
+            try:
+                record['edited_at'] = datetime.fromisoformat(record['edited_at'])
+            except (TypeError, ValueError):
+                raise RestoreError(f'Invalid edited_at in {where}')
+        hours = record.get('estimated_hours')
+        if hours is not None and (not isinstance(hours, (int, float)) or isinstance(hours, bool)):
+            raise RestoreError(f'Invalid estimated_hours in {where}')
+        if 'is_archived' in record:
+            record['is_archived'] = bool(record['is_archived'])
+
+    if table == 'special_days':
+        try:
+            record['date'] = _parse_date(record['date'])
+        except ValueError:
+            raise RestoreError(f'Invalid date in {where}')
+
+    return record
+
+
+def wipe_tables(session):
+    """Delete all restorable data (full restore), dependents first"""
+    for model in (TaskMember, Task, ArchivedTask, SpecialDay, TeamMember, Team):
+        session.execute(delete(model))
+    for table in ('tasks', 'special_days', 'members', 'teams'):
+        mark_changed(session, table, 'delete')
+
+
+def _upsert_batch(session, table, records):
+    """Insert or update records by id; returns the ids written, in order"""
+    ids = [None] * len(records)
+    # Restored rows changed in this database; later diffs must include them.
+    # A task's edited_at (its idle clock) comes from the backup instead.
+    now = datetime.utcnow()
+    for record in records:
+        record['updated_at'] = now
+
+    # Records of one statement must share their table and keys; missing keys
+    # keep their column default (insert) or current value (update). Archived
+    # tasks with an id go straight to the archive table.
+    groups = {}
+    for i, record in enumerate(records):
+        model = BACKUP_MODELS[table]
+        if table in ARCHIVE_MODELS and record.get('is_archived') and 'id' in record:
+            model = ARCHIVE_MODELS[table]
+        groups.setdefault((model, tuple(sorted(record))), []).append(i)
+
+    for (model, keys), positions in groups.items():
+        model_table = model.__table__
+        batch = [records[i] for i in positions]
+        if 'id' in keys:
+            statement = sqlite_insert(model_table)
+            statement = statement.on_conflict_do_update(
+                index_elements=[model_table.c.id],
+                set_={key: statement.excluded[key] for key in keys if key != 'id'}
+            )
+            session.execute(statement, batch)
+            written = [record['id'] for record in batch]
+        else:
+            # Records without an id (bare lists): the database assigns them
+            statement = insert(model_table).returning(model_table.c.id, sort_by_parameter_order=True)
+            written = session.execute(statement, batch).scalars().all()
+        for position, row_id in zip(positions, written):
+            ids[position] = row_id
+
+    if table == 'tasks':
+        # A restored task exists in one task table only
+        archived = [row_id for row_id, record in zip(ids, records) if record.get('is_archived')]
+        with_id = [row_id for row_id, record in zip(ids, records) if 'id' in record]
+        if with_id:
+            session.execute(delete(Task).where(Task.id.in_(set(with_id) & set(archived))))
+            session.execute(delete(ArchivedTask).where(ArchivedTask.id.in_(set(with_id) - set(archived))))
+            reserve_task_ids(session, max(with_id))
+        move_tasks(session, set(archived) - set(with_id), True)
+
+        # Core statements bypass the ORM event that keeps task_member in sync
+        session.execute(delete(TaskMember).where(TaskMember.task_id.in_(ids)))
+        links = [
+            {'task_id': row_id, 'member_name': name}
+            for row_id, record in zip(ids, records)
+            for name in split_members(record.get('members'))
+        ]
+        if links:
+            session.execute(insert(TaskMember), links)
+    return ids
+
+
+def _delete_batch(session, table, ids):
+    if table == 'tasks':
+        session.execute(delete(TaskMember).where(TaskMember.task_id.in_(ids)))
+    for model in table_models(table):
+        session.execute(delete(model).where(model.id.in_(ids)))
+
+
+def restore_backup(stream, target, counts, batch_size=RESTORE_BATCH_SIZE):
+    """Restore an uploaded backup into target ('all' or a table name).
+
+    A generator: yields {'table', 'restored'} after every batch while
+    adding to counts ({table: records}). The caller commits when it is
+    exhausted, or rolls back on RestoreError. A full restore replaces all
+    data; a single table restore inserts or updates by id; a differential
+    backup upserts its rows and deletes its deleted ids.
+    """
+    session = db.session
+    is_full_restore = (target == 'all')
+    is_diff = False
+    full_scope = False
+    wiped = False
+    pending_table, pending = None, []
+    deleted = {}
+    file_counts, trailer = {}, None
+
+    def flush():
+        _upsert_batch(session, pending_table, pending)
+        file_counts[pending_table] = file_counts.get(pending_table, 0) + len(pending)
+        counts[pending_table] = counts.get(pending_table, 0) + len(pending)
+        mark_changed(session, pending_table)
+        return {'table': pending_table, 'restored': counts[pending_table]}
+
+    for kind, key, value in read_backup(open_backup(stream)):
+        if kind == 'header' and key == 'since':
+            is_diff = value is not None
+
+        elif kind == 'header' and key == 'table' and value is not None:
+            if is_full_restore and value != 'all':
+                raise RestoreError('Cannot restore single table backup to "All System"')
+            if not is_full_restore and value == 'all':
+                raise RestoreError('Cannot restore "All System" backup to single table. Select "All System" to restore.')
+            if not is_full_restore and value != target:
+                raise RestoreError(f'Table mismatch: File is "{value}", expected "{target}"')
+
+        elif kind == 'scope':
+            if is_full_restore and key != 'all':
+                raise RestoreError('Invalid backup format for full restore')
+            full_scope = key == 'all'
+            if not is_full_restore and key == 'all':
+                raise RestoreError('Cannot restore "All System" backup to single table. Select "All System" to restore.')
+
+        elif kind == 'row':
+            table = key or target
+            if table not in BACKUP_MODELS:
+                # Unknown tables in a full backup are ignored
+                continue
+            if is_full_restore and not is_diff and not wiped:
+                # Wipe data for full restore to ensure exact state match
+                wipe_tables(session)
+                wiped = True
+            if pending and (table != pending_table or len(pending) >= batch_size):
+                yield flush()
+                pending = []
+            pending_table = table
+            number = file_counts.get(table, 0) + len(pending) + 1
+            pending.append(clean_record(table, value, number))
+
+        elif kind == 'delete':
+            table = key or target
+            if table not in BACKUP_MODELS:
+                continue
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise RestoreError(f'Invalid deleted id in {table} data')
+            deleted.setdefault(table, []).append(value)
+
+        elif kind == 'end':
+            trailer = value
+
+    if is_full_restore and not is_diff and not wiped:
+        if not full_scope:
+            raise RestoreError('Invalid backup format for full restore')
+        # A full backup without rows restores an empty database
+        wipe_tables(session)
+        wiped = True
+
+    if pending:
+        yield flush()
+
+    for table, ids in deleted.items():
+        for i in range(0, len(ids), batch_size):
+            _delete_batch(session, table, ids[i:i + batch_size])
+        mark_changed(session, table, 'delete', ids)
+        yield {'table': table, 'deleted': len(ids)}
+
+    if trailer is not None:
+        for key, actual in (('counts', file_counts), ('deleted', {t: len(ids) for t, ids in deleted.items()})):
+            expected = {t: n for t, n in (trailer.get(key) or {}).items() if t in BACKUP_MODELS and n}
+            if expected != {t: n for t, n in actual.items() if n}:
+                raise RestoreError('Backup file is incomplete: record counts do not match its end marker')
+
+
+def backup_header(stream):
+    """Read the metadata of an uploaded backup, then rewind it"""
+    text = open_backup(stream)
+    header = {}
+    try:
+        for kind, key, value in read_backup(text):
+            if kind != 'header':
+                break
+            header[key] = value
+    finally:
+        # Keep the upload open: detach instead of closing the wrapper
+        text.detach()
+        stream.seek(0)
+    return header
+
+
+def restore_chain(streams, target, counts, batch_size=RESTORE_BATCH_SIZE):
+    """Restore a full backup and/or a chain of differential backups.
+
+    Files are applied oldest first (the full backup, then diffs by
+    backup id) in one transaction. Each diff must start at or before the
+    backup id of the file applied before it, otherwise changes in between
+    would be lost.
+    """
+    files = []
+    for stream in streams:
+        header = backup_header(stream)
+        backup_id = header.get('backup_id')
+        since = header.get('since')
+        try:
+            files.append((
+                since is not None,
+                parse_backup_id(backup_id) if backup_id else datetime.min,
+                parse_backup_id(since) if since else None,
+                stream
+            ))
+        except (TypeError, ValueError):
+            raise RestoreError('Invalid backup file: malformed backup id')
+    files.sort(key=lambda f: (f[0], f[1]))
+
+    if sum(1 for is_diff, *_ in files if not is_diff) > 1:
+        raise RestoreError('Only one full backup can be restored at a time')
+
+    previous = None
+    for is_diff, backup_id, since, stream in files:
+        if is_diff and previous is not None and previous != datetime.min and since > previous:
+            raise RestoreError(
+                f'Gap in backup chain: diff since {since.isoformat()} follows a backup taken at {previous.isoformat()}'
+            )
+        yield from restore_backup(stream, target, counts, batch_size)
+        previous = backup_id
@@ -0,0 +1,175 @@
+"""Bulk archive / unarchive of the tasks matching a filter.
+
+    {"filter": {"project": "Infrastructure", "status": "status-done"}}
+    {"filter": {"team_id": 2, "older_than_days": 30}, "archive": true}
+
+Up to SYNC_LIMIT matching tasks are moved to (or from) the archive table
+by one set-based INSERT ... SELECT / DELETE pair inside the request.
+Larger sets run as a background job in chunks of CHUNK_SIZE, one
+transaction per chunk so other writers get the lock in between, with
+progress kept in the `job` table (GET /api/jobs/<id>) where any worker can
+read it. Either way each transaction bumps the tasks data version and
+appends a single change-log entry for all the rows it touched.
+
+Every chunk also refreshes the job's `updated_at` heartbeat. A running job
+without a heartbeat for JOB_STALE_AFTER lost its worker (restarted or
+killed): the next worker to read it takes it over and resumes it, which is
+safe because a job just moves whatever still matches its filter. Other
+kinds of jobs are marked failed instead.
+"""
+import json
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, func, update, or_
+
+from models import db, Job
+from archive import task_model, move_tasks
+
+SYNC_LIMIT = 2000
+CHUNK_SIZE = 500
+CHUNK_PAUSE = 0.05  # seconds between chunks, for other writers
+JOB_STALE_AFTER = timedelta(minutes=2)  # running without a heartbeat this long: its worker is gone
+
+FILTER_KEYS = ('project', 'team_id', 'status', 'older_than_days', 'idle_days')
+
+
+class BulkArchiveError(ValueError):
+    pass
+
+
+def parse_filter(data):
+    """Validated filter criteria (JSON-serializable, stored with a job)"""
+    if not isinstance(data, dict):
+        raise BulkArchiveError('filter must be an object')
+    unknown = [key for key in data if key not in FILTER_KEYS]
+    if unknown:
+        raise BulkArchiveError(f'Unknown filter keys: {", ".join(unknown)}. Allowed: {", ".join(FILTER_KEYS)}')
+    criteria = {key: value for key, value in data.items() if value not in (None, '')}
+    if not criteria:
+        raise BulkArchiveError('filter needs at least one of: ' + ', '.join(FILTER_KEYS))
+
+    for key in ('project', 'status'):
+        if key in criteria and not isinstance(criteria[key], str):
+            raise BulkArchiveError(f'{key} must be text')
+    for key in ('team_id', 'older_than_days', 'idle_days'):
+        if key in criteria:
+            try:
+                criteria[key] = int(criteria[key])
+            except (TypeError, ValueError):
+                raise BulkArchiveError(f'{key} must be a number')
+    for key in ('older_than_days', 'idle_days'):
+        if criteria.get(key, 0) < 0:
+            raise BulkArchiveError(f'{key} must not be negative')
+    return criteria
+
+
+def filter_conditions(criteria, model):
+    """WHERE clauses for the tasks of model's table matching criteria"""
+    conditions = []
+    if 'project' in criteria:
+        conditions.append(model.project == criteria['project'])
+    if 'team_id' in criteria:
+        conditions.append(model.team_id == criteria['team_id'])
+    if 'status' in criteria:
+        conditions.append(model.status == criteria['status'])
+    if 'older_than_days' in criteria:
+        # Ended (or, without an end date, started) more than N days ago
+        cutoff = date.today() - timedelta(days=criteria['older_than_days'])
+        conditions.append(func.coalesce(model.end_date, model.start_date) < cutoff)
+    if 'idle_days' in criteria:
+        # Not edited (e.g. marked done) for more than N days
+        conditions.append(model.edited_at < datetime.utcnow() - timedelta(days=criteria['idle_days']))
+    return conditions
+
+
+def count_matching(session, criteria, archive):
+    """Matching tasks that are not in the target state yet"""
+    source = task_model(not archive)
+    return session.execute(
+        select(func.count()).select_from(source).where(*filter_conditions(criteria, source))
+    ).scalar()
+
+
+def set_archived(session, criteria, archive, limit=None):
+    """Move up to `limit` matching tasks into (or out of) the archive; returns their ids"""
+    source = task_model(not archive)
+    query = select(source.id).where(*filter_conditions(criteria, source)).order_by(source.id).limit(limit)
+    return move_tasks(session, session.execute(query).scalars().all(), archive)
+
+
+def start_archive_job(app, session, criteria, archive, total):
+    """Record a job and run it in a background thread; returns the Job"""
+    job = Job(kind='archive', params=json.dumps({'filter': criteria, 'archive': archive}), total=total)
+    session.add(job)
+    session.commit()
+    _run_in_background(app, job.id)
+    return job
+
+
+def _run_in_background(app, job_id):
+    threading.Thread(
+        target=run_archive_job, args=(app, job_id), name=f'archive-job-{job_id}', daemon=True
+    ).start()
+
+
+def recover_stale_job(app, session, job):
+    """Take over `job` if it is running without a heartbeat; returns it up to date.
+
+    Archive jobs are resumed in this process, others marked failed. The
+    conditional UPDATE lets only one of several workers polling it win.
+    """
+    now = datetime.utcnow()
+    cutoff = now - JOB_STALE_AFTER
+    if job.status != 'running' or (job.updated_at or job.created_at) > cutoff:
+        return job
+
+    resume = job.kind == 'archive'
+    values = {'updated_at': now} if resume else {
+        'status': 'failed', 'error': 'The worker running the job stopped', 'finished_at': now
+    }
+    claimed = session.execute(
+        update(Job).where(
+            Job.id == job.id, Job.status == 'running',
+            or_(Job.updated_at.is_(None), Job.updated_at <= cutoff)
+        ).values(**values)
+    ).rowcount
+    session.commit()
+    if claimed:
+        app.logger.warning('Job %s lost its worker, %s', job.id, 'resuming it' if resume else 'marked failed')
+        if resume:
+            _run_in_background(app, job.id)
+    session.refresh(job)
+    return job
+
+
+def run_archive_job(app, job_id):
+    """Archive in chunks until nothing matches, recording progress per chunk"""
+    with app.app_context():
+        session = db.session
+        try:
+            job = session.get(Job, job_id)
+            params = json.loads(job.params)
+            while True:
+                ids = set_archived(session, params['filter'], params['archive'], limit=CHUNK_SIZE)
+                if not ids:
+                    break
+                job.done += len(ids)
+                session.commit()
+                time.sleep(CHUNK_PAUSE)
+            job.status = 'done'
+            job.total = max(job.total, job.done)
+            job.finished_at = datetime.utcnow()
+            session.commit()
+        except Exception as e:
+            app.logger.exception('Archive job %s failed', job_id)
+            session.rollback()
+            job = session.get(Job, job_id)
+            if job is not None:
+                job.status = 'failed'
+                job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                session.commit()
+        finally:
+            session.remove()
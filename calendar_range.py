@@ -0,0 +1,55 @@
+"""Date-range queries for the calendar endpoints.
+
+A task occupies the interval [start_date, end_date]; when only one of the
+dates is set it occupies that single day. "Overlaps [a, b]" is then one
+predicate over two expressions, both covered by the expression index
+ix_task_span (ix_archived_task_span in the archive), so a quarter or a year
+is answered by the same single index range scan as a week.
+"""
+from sqlalchemy import func, or_, select
+
+from models import Task, ArchivedTask, TaskMember, TeamMember
+
+# Longest range a single request may ask for
+MAX_RANGE_DAYS = 366 * 2
+
+
+def task_span(model):
+    """Effective interval (start, end) of a task, NULL for tasks without any date.
+
+    These must stay identical to the expressions of the span indexes in models.py.
+    """
+    return func.coalesce(model.start_date, model.end_date), func.coalesce(model.end_date, model.start_date)
+
+
+def overlapping(start, end, model=Task):
+    """Criterion: task interval overlaps [start, end] (inclusive)"""
+    span_start, span_end = task_span(model)
+    return (span_end >= start) & (span_start <= end)
+
+
+def team_task_filter(team_id):
+    """Tasks owned by a team or assigned to any of its members (indexed join)"""
+    team_member_names = select(TeamMember.name_en).where(TeamMember.team_id == team_id)
+    return or_(
+        Task.team_id == team_id,
+        Task.member_links.any(TaskMember.member_name.in_(team_member_names))
+    )
+
+
+def range_model(team_id):
+    """Task table of a calendar filter scope: the archive for 'archive'"""
+    return ArchivedTask if team_id == 'archive' else Task
+
+
+def tasks_in_range(start, end, team_id=None):
+    """Query for tasks overlapping [start, end] in a calendar filter scope.
+
+    team_id: None for all active tasks, 'archive' for archived tasks, or a
+    team id for active tasks of that team (owned or assigned to a member).
+    """
+    model = range_model(team_id)
+    query = model.query.filter(overlapping(start, end, model))
+    if team_id and team_id != 'archive':
+        query = query.filter(team_task_filter(team_id))
+    return query
@@ -0,0 +1,328 @@
+"""Change tracking for committed writes.
+
+Every flush records which rows of the tracked tables were inserted, updated
+or deleted. Right before the transaction commits, the per-table counters in
+`data_version` are bumped and one `change_log` entry per (table, op) is
+appended, all in the same transaction. Once it has committed a small change
+notice is published to the in-process broadcaster, which feeds the
+/api/stream endpoint; /api/changes serves row deltas from the change log.
+
+Commits made by other worker processes are picked up by a background
+watcher that polls the (tiny) `data_version` table.
+"""
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, select, update, insert, delete, func
+from sqlalchemy.orm import Session
+
+from models import db, Team, TeamMember, Task, ArchivedTask, SpecialDay, DataVersion, ChangeLog
+
+# Model -> public table name used in change notices and data versions
+TRACKED_MODELS = {
+    Task: 'tasks',
+    ArchivedTask: 'tasks',
+    Team: 'teams',
+    TeamMember: 'members',
+    SpecialDay: 'special_days'
+}
+TRACKED_TABLES = tuple(dict.fromkeys(TRACKED_MODELS.values()))
+MODELS_BY_TABLE = {table: [model for model, name in TRACKED_MODELS.items() if name == table] for table in TRACKED_TABLES}
+
+# Change log compaction: drop entries older than the retention window,
+# checked every COMPACT_EVERY appended entries
+CHANGE_LOG_RETENTION = timedelta(days=7)
+COMPACT_EVERY = 500
+
+PENDING_KEY = 'pending_changes'
+VERSIONS_KEY = 'pending_versions'
+
+
+def global_version(versions):
+    """Collapse per-table counters into one monotonic number"""
+    return sum(versions.values())
+
+
+class ChangeBroadcaster:
+    """Fan out change notices to waiting stream/long-poll listeners"""
+
+    def __init__(self, history=200):
+        self._condition = threading.Condition()
+        self._history = deque(maxlen=history)
+        self._tables = None
+        self._watcher = None
+        self.version = 0
+
+    def publish(self, changes, versions):
+        """Publish a locally committed change.
+
+        Tables whose counter moved further than this commit explains were
+        changed by another process in the meantime; they are reported as
+        whole-table changes.
+        """
+        with self._condition:
+            bumped = {change['table'] for change in changes}
+            changes = list(changes) + self._foreign_changes(versions, bumped)
+            return self._publish(changes, versions)
+
+    def sync(self, versions):
+        """Publish whatever changed in the database since we last looked"""
+        with self._condition:
+            if self._tables is None:
+                self._tables = dict(versions)
+                self.version = global_version(versions)
+                return None
+            changes = self._foreign_changes(versions, set())
+            if not changes:
+                return None
+            return self._publish(changes, versions)
+
+    def notices_since(self, version):
+        """Return notices newer than version, or None if they were dropped"""
+        with self._condition:
+            return self._notices_since(version)
+
+    def wait(self, version, timeout):
+        """Block until a notice newer than version exists (or timeout).
+
+        Returns a list of notices, an empty list on timeout, or None when
+        the listener fell too far behind and must do a full refresh.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.version > version, timeout=timeout)
+            return self._notices_since(version)
+
+    def start_watcher(self, app, interval):
+        """Start the cross-process watcher thread (once per process)"""
+        with self._condition:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(
+                target=self._watch, args=(app, interval), name='data-version-watcher', daemon=True
+            )
+        # Establish the baseline before any listener reads self.version
+        with app.app_context():
+            self.sync(read_versions(db.session))
+            db.session.remove()
+        self._watcher.start()
+
+    def _watch(self, app, interval):
+        stop = threading.Event()
+        while not stop.wait(interval):
+            try:
+                with app.app_context():
+                    self.sync(read_versions(db.session))
+                    db.session.remove()
+            except Exception:
+                app.logger.exception('Data version watcher failed')
+
+    def _foreign_changes(self, versions, bumped):
+        if self._tables is None:
+            # No baseline yet (watcher not started) - nothing to compare with
+            return []
+        known = self._tables
+        changes = []
+        for table, version in sorted(versions.items()):
+            expected = known.get(table, 0) + (1 if table in bumped else 0)
+            if version > expected:
+                changes.append({'table': table, 'op': 'update', 'ids': None})
+        return changes
+
+    def _publish(self, changes, versions):
+        previous = self.version
+        self._tables = dict(versions)
+        self.version = max(self.version, global_version(versions))
+        notice = {'previous': previous, 'version': self.version, 'tables': dict(versions), 'changes': changes}
+        self._history.append(notice)
+        self._condition.notify_all()
+        return notice
+
+    def _notices_since(self, version):
+        if version >= self.version:
+            return []
+        if not self._history or self._history[0]['previous'] > version:
+            return None
+        return [n for n in self._history if n['version'] > version]
+
+
+broadcaster = ChangeBroadcaster()
+
+
+def init_data_versions():
+    """Make sure every tracked table has a counter row"""
+    existing = set(db.session.execute(select(DataVersion.table_name)).scalars())
+    for table in TRACKED_TABLES:
+        if table not in existing:
+            db.session.add(DataVersion(table_name=table, version=0))
+    db.session.commit()
+
+
+def read_versions(session):
+    """Return {table: version} for all tracked tables"""
+    rows = session.execute(select(DataVersion.table_name, DataVersion.version)).all()
+    versions = {table: 0 for table in TRACKED_TABLES}
+    versions.update({table: version for table, version in rows})
+    return versions
+
+
+def mark_changed(session, table, op='update', ids=None):
+    """Record a change made outside the ORM unit of work (bulk statements).
+
+    ids=None means "any row of this table may have changed".
+    """
+    pending = session.info.setdefault(PENDING_KEY, {})
+    bucket = pending.setdefault((table, op), set())
+    if ids is None:
+        bucket.add(None)
+    else:
+        bucket.update(ids)
+
+
+def _bump_versions(session, tables):
+    for table in tables:
+        result = session.execute(
+            update(DataVersion)
+            .where(DataVersion.table_name == table)
+            .values(version=DataVersion.version + 1)
+        )
+        if result.rowcount == 0:
+            session.execute(insert(DataVersion).values(table_name=table, version=1))
+    return read_versions(session)
+
+
+def _append_change_log(session, pending):
+    now = datetime.utcnow()
+    cursor = None
+    for (table, op), ids in sorted(pending.items()):
+        row_ids = None if None in ids else ','.join(str(i) for i in sorted(ids))
+        result = session.execute(
+            insert(ChangeLog).values(table_name=table, op=op, row_ids=row_ids, created_at=now)
+        )
+        cursor = result.inserted_primary_key[0]
+    if cursor // COMPACT_EVERY != (cursor - len(pending)) // COMPACT_EVERY:
+        compact_change_log(session)
+    return cursor
+
+
+def compact_change_log(session, retention=CHANGE_LOG_RETENTION):
+    """Drop change log entries older than the retention window.
+
+    The newest entry is always kept so the cursor position survives.
+    Returns the number of deleted entries.
+    """
+    latest = session.execute(select(func.max(ChangeLog.id))).scalar()
+    if latest is None:
+        return 0
+    result = session.execute(
+        delete(ChangeLog)
+        .where(ChangeLog.created_at < datetime.utcnow() - retention)
+        .where(ChangeLog.id < latest)
+    )
+    return result.rowcount
+
+
+def changes_since(session, cursor, limit=1000):
+    """Build the row delta between cursor and the head of the change log.
+
+    Returns a dict with the new cursor, whether more entries remain, the
+    changed rows ('upsert' with the current row, or 'delete'), and tables
+    that changed wholesale and must be reloaded. 'reset' means the cursor
+    fell behind compaction and the client has to reload everything.
+    """
+    first, latest = session.execute(select(func.min(ChangeLog.id), func.max(ChangeLog.id))).one()
+    latest = latest or 0
+    if cursor is None:
+        return {'cursor': latest, 'more': False, 'reset': False, 'reload': [], 'changes': []}
+    if cursor > latest or (first is not None and cursor < first - 1):
+        return {'cursor': latest, 'more': False, 'reset': True, 'reload': [], 'changes': []}
+
+    entries = session.execute(
+        select(ChangeLog).where(ChangeLog.id > cursor).order_by(ChangeLog.id).limit(limit + 1)
+    ).scalars().all()
+    more = len(entries) > limit
+    entries = entries[:limit]
+
+    final_ops = {}  # (table, id) -> 'upsert' | 'delete', last write wins
+    reload = set()
+    for entry in entries:
+        if entry.row_ids is None:
+            reload.add(entry.table_name)
+            continue
+        op = 'delete' if entry.op == 'delete' else 'upsert'
+        for row_id in entry.row_ids.split(','):
+            final_ops[(entry.table_name, int(row_id))] = op
+
+    rows = {}
+    for table in TRACKED_TABLES:
+        ids = [row_id for (t, row_id), op in final_ops.items() if t == table and op == 'upsert']
+        if not ids or table in reload:
+            continue
+        for model in MODELS_BY_TABLE[table]:
+            for record in session.execute(select(model).where(model.id.in_(ids))).scalars():
+                rows[(table, record.id)] = record.to_dict()
+
+    changes = []
+    for (table, row_id), op in sorted(final_ops.items()):
+        if table in reload:
+            continue
+        row = rows.get((table, row_id))
+        if op == 'upsert' and row is not None:
+            changes.append({'table': table, 'op': 'upsert', 'id': row_id, 'row': row})
+        else:
+            # Deleted, or updated and deleted again within the window
+            changes.append({'table': table, 'op': 'delete', 'id': row_id})
+
+    return {
+        'cursor': entries[-1].id if entries else cursor,
+        'more': more,
+        'reset': False,
+        'reload': sorted(reload),
+        'changes': changes
+    }
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    for op, objects in (('insert', session.new), ('update', session.dirty), ('delete', session.deleted)):
+        for obj in objects:
+            table = TRACKED_MODELS.get(type(obj))
+            if not table:
+                continue
+            if op == 'update' and not session.is_modified(obj, include_collections=False):
+                continue
+            mark_changed(session, table, op, [obj.id])
+
+
+@event.listens_for(Session, 'before_commit')
+def _version_changes(session):
+    # Flush first so the last unit of work is included in this commit's counters
+    session.flush()
+    pending = session.info.get(PENDING_KEY)
+    if not pending:
+        return
+    tables = sorted({table for table, op in pending})
+    session.info[VERSIONS_KEY] = _bump_versions(session, tables)
+    _append_change_log(session, pending)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_changes(session):
+    pending = session.info.pop(PENDING_KEY, None)
+    versions = session.info.pop(VERSIONS_KEY, None)
+    if not pending or versions is None:
+        return
+    changes = []
+    for (table, op), ids in sorted(pending.items()):
+        changes.append({
+            'table': table,
+            'op': op,
+            'ids': None if None in ids else sorted(ids)
+        })
+    broadcaster.publish(changes, versions)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(VERSIONS_KEY, None)
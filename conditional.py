@@ -0,0 +1,45 @@
+"""Conditional GET for read APIs.
+
+A read endpoint's response is fully determined by its URL (path and query
+arguments), the data versions of the tables it reads and, for endpoints
+that default to "this week"/"this month", today's date. The ETag is a hash
+of exactly those, so it can be computed from the tiny `data_version` table
+and an If-None-Match hit is answered with 304 before the view runs any
+query of its own.
+"""
+import hashlib
+from datetime import date
+from functools import wraps
+
+from flask import current_app, request
+
+from models import db
+from changes import read_versions
+
+
+def version_etag(versions, tables):
+    parts = [request.path]
+    parts.extend(f'{key}={value}' for key, value in sorted(request.args.items(multi=True)))
+    parts.extend(f'{table}:{versions[table]}' for table in tables)
+    parts.append(date.today().isoformat())
+    return hashlib.sha1('\n'.join(parts).encode('utf-8')).hexdigest()
+
+
+def conditional_get(*tables):
+    """Decorate a GET view whose response depends only on `tables`"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = version_etag(read_versions(db.session), tables)
+            if request.if_none_match.contains(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            # Cache, but revalidate every time: versions move on any write
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,107 @@
+"""Database connection settings.
+
+SQLite runs in WAL mode: readers work from a snapshot of the last commit,
+so they never wait for the single writer and the writer never waits for
+them. busy_timeout makes a second writer queue for the lock instead of
+failing with "database is locked".
+
+Every pragma can be overridden in app.config['SQLITE_PRAGMAS'] or with an
+environment variable named SQLITE_<PRAGMA> (e.g. SQLITE_CACHE_SIZE).
+
+Each worker process creates its own engine when it loads the app. Its pool
+holds one connection per request thread (WEB_THREADS) plus a little
+headroom for background threads; override with DB_POOL_SIZE,
+DB_MAX_OVERFLOW and DB_POOL_TIMEOUT (config or environment).
+"""
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from models import db
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # Durable across application crashes; in WAL mode only a power loss
+    # can lose the latest commits
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms
+    'cache_size': -32000,  # negative: KiB, i.e. 32 MB page cache per connection
+    'mmap_size': 256 * 1024 * 1024,  # read pages through the OS page cache
+    'temp_store': 'MEMORY',  # sorts and temporary indexes
+}
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_MAX_OVERFLOW = 2
+DEFAULT_POOL_TIMEOUT = 30
+
+
+def setting(config, name, default):
+    """App config value, else the environment variable of the same name, else default"""
+    value = config.get(name, os.environ.get(name))
+    return default if value in (None, '') else value
+
+
+def sqlite_pragmas(config):
+    """Pragmas to run on every new SQLite connection, in order"""
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    pragmas.update(config.get('SQLITE_PRAGMAS') or {})
+    for name in list(pragmas):
+        env_value = os.environ.get(f'SQLITE_{name.upper()}')
+        if env_value:
+            pragmas[name] = env_value
+    return pragmas
+
+
+def engine_options(config):
+    """SQLAlchemy engine options for this worker process"""
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    options = {}
+    if url.get_backend_name() == 'sqlite':
+        busy_timeout = int(sqlite_pragmas(config).get('busy_timeout', 5000))
+        # pysqlite applies its own lock timeout (seconds) before our pragmas run
+        options['connect_args'] = {'timeout': busy_timeout / 1000}
+        if url.database in (None, '', ':memory:'):
+            # In-memory databases use a single shared connection, not a pool
+            return options
+
+    threads = setting(config, 'WEB_THREADS', DEFAULT_POOL_SIZE)
+    options['pool_size'] = int(setting(config, 'DB_POOL_SIZE', threads))
+    options['max_overflow'] = int(setting(config, 'DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW))
+    options['pool_timeout'] = int(setting(config, 'DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT))
+    return options
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def register_pragmas(engine, pragmas):
+    """Run pragmas on every connection the engine opens"""
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        if isinstance(dbapi_connection, sqlite3.Connection):
+            apply_pragmas(dbapi_connection, pragmas)
+
+
+def init_database(app):
+    """Bind the SQLAlchemy extension to app with tuned connections.
+
+    Explicit SQLALCHEMY_ENGINE_OPTIONS take precedence over the defaults.
+    """
+    options = engine_options(app.config)
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+    db.init_app(app)
+
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                register_pragmas(engine, pragmas)
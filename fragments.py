@@ -0,0 +1,102 @@
+"""In-process cache of rendered per-project HTML fragments.
+
+The dashboard (/) and the print report (/print) are lists of project
+sections. Each section is rendered from its own template and cached under
+the project's signature: the number of its (filtered) tasks, their latest
+updated_at and the sum of their ids, read for all projects in one grouped
+query. Any insert, update, delete or archive move of a task changes the
+signature of its project only, so after an edit one section is rendered
+again and the rest come from the cache. Everything else a section depends
+on (filters, the reference data version, its position) is part of the key.
+
+Entries are evicted least recently used first, MAX_FRAGMENTS per app.
+Each fragment also carries a short digest of its key, the same in every
+worker, so a client holding a page can ask for just the sections whose
+digest changed (see /partials/project-cards).
+"""
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+from flask import current_app, render_template
+from markupsafe import Markup
+from sqlalchemy import func
+
+MAX_FRAGMENTS = 1000
+EXTENSION_KEY = 'fragment_cache'
+
+Fragment = namedtuple('Fragment', 'project key html')
+
+
+class FragmentCache:
+    def __init__(self, max_entries=MAX_FRAGMENTS):
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            fragment = self._entries.get(key)
+            if fragment is not None:
+                self._entries.move_to_end(key)
+            return fragment
+
+    def put(self, key, fragment):
+        with self._lock:
+            self._entries[key] = fragment
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+
+def init_fragment_cache(app):
+    app.extensions[EXTENSION_KEY] = FragmentCache()
+
+
+def project_signatures(query, model):
+    """Signature of each project with tasks in query: {project: (count, latest update, id sum)}"""
+    rows = query.order_by(None).with_entities(
+        model.project, func.count(), func.max(model.updated_at), func.sum(model.id)
+    ).group_by(model.project)
+    return {project: tuple(signature) for project, *signature in rows}
+
+
+def project_fragments(template, query, model, signatures, key, project_keys=None, **context):
+    """One Fragment per project of signatures, sorted by project name.
+
+    Sections missing from the cache are rendered from one query for just
+    their tasks. The template gets `project`, its `tasks` (in query order),
+    its `index` in the list, its `fragment_key` and `context`; key must
+    cover everything in context, project_keys anything else that differs
+    per project.
+    """
+    cache = current_app.extensions[EXTENSION_KEY]
+    project_keys = project_keys or {}
+    projects = sorted(signatures)
+    fragments = {}
+    missing = {}
+    for index, project in enumerate(projects):
+        cache_key = (template, model.__tablename__, project, index, signatures[project],
+                     project_keys.get(project), key)
+        fragment = cache.get(cache_key)
+        if fragment is None:
+            missing[project] = (index, cache_key)
+        else:
+            fragments[project] = fragment
+
+    if missing:
+        # Read after the signatures, so a concurrent write can only make a
+        # section newer than its key (and re-rendered once more), never older
+        tasks_by_project = {project: [] for project in missing}
+        for task in query.filter(model.project.in_(list(missing))):
+            tasks_by_project[task.project].append(task)
+        for project, (index, cache_key) in missing.items():
+            digest = hashlib.sha1(repr(cache_key).encode()).hexdigest()[:12]
+            html = Markup(render_template(
+                template, project=project, tasks=tasks_by_project[project], index=index,
+                fragment_key=digest, **context
+            ))
+            fragments[project] = Fragment(project, digest, html)
+            cache.put(cache_key, fragments[project])
+
+    return [fragments[project] for project in projects]
@@ -0,0 +1,58 @@
+"""Gunicorn settings for production serving.
+
+    gunicorn --config gunicorn.conf.py "app:create_app()"
+
+Every setting can be overridden from the environment. Threads matter more
+than processes here: SQLite serializes writes anyway. An open change stream
+(/api/stream) holds a thread, so a worker keeps at most STREAM_LIMIT of them
+open (half its threads by default) and the rest of its threads for requests;
+further clients poll /api/version instead (routes/stream.py).
+
+Send HUP to the master to reload the code gracefully: new workers start,
+old ones finish their requests (up to graceful_timeout) and exit.
+"""
+import os
+import subprocess
+import sys
+
+
+def _env_int(name, default):
+    return int(os.environ.get(name, default))
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+worker_class = 'gthread'
+workers = _env_int('WEB_CONCURRENCY', 2)
+threads = _env_int('WEB_THREADS', 16)
+
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)  # seconds an idle connection stays open
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+
+# Recycle workers now and then (jitter keeps them from restarting together);
+# open change streams reconnect and resume from their last event id
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 200)
+
+# Workers import the app themselves (own engine and pool per process, and
+# HUP picks up new code); the master only upgrades the schema, once.
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+# Worker heartbeat files on tmpfs rather than the container overlay
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+
+def on_starting(server):
+    """Apply schema migrations before any worker starts serving"""
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'app', 'db-upgrade'], check=True)
+
+
+def post_worker_init(worker):
+    """Start the auto-archive scheduler when AUTO_ARCHIVE_INTERVAL is set (one worker runs each interval)"""
+    from auto_archive import start_scheduler
+    start_scheduler(worker.wsgi)
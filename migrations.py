@@ -0,0 +1,241 @@
+"""Versioned schema migrations.
+
+`db.create_all()` only creates missing tables; everything an existing
+database needs beyond that (new columns, indexes, backfills) is a numbered
+migration below. Each one runs once, in order, in its own transaction, and
+is recorded in `schema_migrations`. Migrations are written to be safe to
+re-run, so two workers starting at the same time cannot break the schema.
+
+Run automatically at startup, or by hand with `flask db-upgrade`.
+"""
+from datetime import datetime
+
+from sqlalchemy import text, inspect, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.schema import CreateTable, CreateIndex
+
+from models import db, Task, ArchivedTask, TaskMember, SchemaMigration, split_members
+from search import init_search_index, drop_search_index, FTS_TRIGGERS
+from changes import init_data_versions
+from backup import init_tombstones
+from archive import TASK_COLUMN_NAMES
+
+MIGRATIONS = []
+
+
+def migration(version, name):
+    """Register fn(conn) as migration number `version`"""
+    def register(fn):
+        MIGRATIONS.append((version, name, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _columns(conn, table):
+    return {column['name'] for column in inspect(conn).get_columns(table)}
+
+
+def _create_index(conn, name, table, columns):
+    conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})'))
+
+
+def _table_sql(conn, table):
+    return conn.execute(
+        text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': table}
+    ).scalar()
+
+
+@migration(1, 'task calendar columns')
+def add_calendar_columns(conn):
+    columns = _columns(conn, 'task')
+    for name, column_type in (('start_date', 'DATE'), ('end_date', 'DATE'), ('estimated_hours', 'REAL')):
+        if name not in columns:
+            conn.execute(text(f'ALTER TABLE task ADD COLUMN {name} {column_type}'))
+
+
+@migration(2, 'task archive flag')
+def add_archive_flag(conn):
+    if 'is_archived' not in _columns(conn, 'task'):
+        conn.execute(text('ALTER TABLE task ADD COLUMN is_archived BOOLEAN DEFAULT 0 NOT NULL'))
+
+
+@migration(3, 'task_member backfill')
+def backfill_task_members(conn):
+    if conn.execute(select(TaskMember.task_id).limit(1)).first() is not None:
+        return
+    rows = []
+    for task_id, members in conn.execute(select(Task.id, Task.members).where(Task.members != '')):
+        rows.extend({'task_id': task_id, 'member_name': name} for name in split_members(members))
+    if rows:
+        conn.execute(insert(TaskMember), rows)
+
+
+@migration(4, 'task full-text index')
+def create_search_index(conn):
+    init_search_index(conn)
+
+
+@migration(5, 'hot filter indexes')
+def add_filter_indexes(conn):
+    # Index page / table editor: is_archived filter, team filter
+    _create_index(conn, 'ix_task_archived_team', 'task', ['is_archived', 'team_id'])
+    # Calendar week/month/workload date ranges (superseded by migration 6)
+    _create_index(conn, 'ix_task_archived_dates', 'task', ['is_archived', 'start_date', 'end_date'])
+    # Print view and bulk actions filtering by status
+    _create_index(conn, 'ix_task_archived_status', 'task', ['is_archived', 'status'])
+    # Project filter and project -> team lookup (min(id) per project)
+    _create_index(conn, 'ix_task_project', 'task', ['project', 'is_archived'])
+    # Team filter subquery and special day ranges
+    _create_index(conn, 'ix_team_member_team_id', 'team_member', ['team_id'])
+    _create_index(conn, 'ix_special_day_date', 'special_day', ['date'])
+
+
+@migration(6, 'task span index')
+def add_span_index(conn):
+    # Replaces the plain date index: calendar queries now filter on the
+    # effective interval (a task with one date occupies that day)
+    conn.execute(text(
+        'CREATE INDEX IF NOT EXISTS ix_task_archived_span ON task '
+        '(is_archived, coalesce(end_date, start_date), coalesce(start_date, end_date))'
+    ))
+    conn.execute(text('DROP INDEX IF EXISTS ix_task_archived_dates'))
+
+
+@migration(7, 'change timestamps and tombstones')
+def add_change_tracking(conn):
+    # Differential backups: updated_at on every backed up table (existing
+    # rows count as changed now) and tombstones for deleted rows
+    now = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S.%f')
+    for table in ('team', 'team_member', 'task', 'special_day'):
+        if 'updated_at' not in _columns(conn, table):
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN updated_at DATETIME'))
+        conn.execute(
+            text(f'UPDATE {table} SET updated_at = :now WHERE updated_at IS NULL'), {'now': now}
+        )
+        _create_index(conn, f'ix_{table}_updated_at', table, ['updated_at'])
+    init_tombstones(conn)
+
+
+@migration(8, 'archive keyset index')
+def add_archive_index(conn):
+    # Archive pages: is_archived = 1 ORDER BY task, id (id is the rowid,
+    # stored in every index entry), resumed with (task, id) > cursor
+    _create_index(conn, 'ix_task_archived_name', 'task', ['is_archived', 'task'])
+
+
+@migration(9, 'cold archive table')
+def move_archived_tasks(conn):
+    # Archived tasks move to archived_task (see archive.py), which shares
+    # task ids: `task` is rebuilt with AUTOINCREMENT so the id of a task
+    # moved out of it is never handed out again
+    if conn.dialect.name != 'sqlite':
+        return
+    # The search and tombstone triggers are recreated move-aware below
+    for trigger in FTS_TRIGGERS + ('task_tombstone', 'archived_task_tombstone'):
+        conn.execute(text(f'DROP TRIGGER IF EXISTS {trigger}'))
+
+    columns = ', '.join(TASK_COLUMN_NAMES)
+    if _table_sql(conn, 'task__old') is not None or 'AUTOINCREMENT' not in _table_sql(conn, 'task').upper():
+        if _table_sql(conn, 'task__old') is None:
+            # legacy_alter_table: task_member keeps referencing "task", i.e. the new table
+            conn.execute(text('PRAGMA legacy_alter_table = ON'))
+            conn.execute(text('ALTER TABLE task RENAME TO task__old'))
+            conn.execute(text('PRAGMA legacy_alter_table = OFF'))
+            conn.execute(CreateTable(Task.__table__))
+        # Columns added by later migrations keep their defaults until then
+        old_columns = _columns(conn, 'task__old')
+        copied = ', '.join(name for name in TASK_COLUMN_NAMES if name in old_columns)
+        conn.execute(text(f'INSERT OR IGNORE INTO task ({copied}) SELECT {copied} FROM task__old'))
+        conn.execute(text('DROP TABLE task__old'))
+
+    # Indexes led by is_archived are pointless once `task` only holds active tasks
+    for name in ('ix_task_archived_team', 'ix_task_archived_dates', 'ix_task_archived_status',
+                 'ix_task_archived_span', 'ix_task_archived_name'):
+        conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+    for table in (Task.__table__, ArchivedTask.__table__):
+        for index in table.indexes:
+            conn.execute(CreateIndex(index, if_not_exists=True))
+    init_search_index(conn)
+    init_tombstones(conn)
+
+    conn.execute(text(f'INSERT INTO archived_task ({columns}) SELECT {columns} FROM task WHERE is_archived = 1'))
+    conn.execute(text('DELETE FROM task WHERE is_archived = 1'))
+
+
+@migration(10, 'task_member without task foreign key')
+def drop_task_member_foreign_key(conn):
+    # task_member rows stay put when a task moves to archived_task, so a
+    # foreign key to `task` is violated by every archived task's links
+    if conn.dialect.name != 'sqlite' or 'REFERENCES' not in _table_sql(conn, 'task_member').upper():
+        return
+    conn.execute(text('ALTER TABLE task_member RENAME TO task_member__old'))
+    conn.execute(CreateTable(TaskMember.__table__))
+    conn.execute(text('INSERT INTO task_member (task_id, member_name) '
+                      'SELECT task_id, member_name FROM task_member__old'))
+    conn.execute(text('DROP TABLE task_member__old'))
+    for index in TaskMember.__table__.indexes:
+        conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+@migration(11, 'job heartbeat')
+def add_job_heartbeat(conn):
+    if 'updated_at' not in _columns(conn, 'job'):
+        conn.execute(text('ALTER TABLE job ADD COLUMN updated_at DATETIME'))
+
+
+@migration(12, 'task edit timestamps')
+def add_edited_at(conn):
+    # idle_days rules go by the last edit, which restores and archive moves
+    # keep. Rows untouched since migration 7 stamped updated_at on all of
+    # them fall back to their end (or start) date.
+    stamped = conn.execute(select(SchemaMigration.applied_at).where(SchemaMigration.version == 7)).scalar()
+    stamped = stamped.strftime('%Y-%m-%d %H:%M:%S.%f') if stamped else None
+    for table in ('task', 'archived_task'):
+        if 'edited_at' not in _columns(conn, table):
+            conn.execute(text(f'ALTER TABLE {table} ADD COLUMN edited_at DATETIME'))
+        conn.execute(text(
+            f"UPDATE {table} SET edited_at = CASE WHEN updated_at <= :stamped THEN COALESCE("
+            f"end_date || ' 00:00:00.000000', start_date || ' 00:00:00.000000', updated_at) "
+            f"ELSE updated_at END WHERE edited_at IS NULL"
+        ), {'stamped': stamped})
+
+def applied_versions(conn):
+    return set(conn.execute(select(SchemaMigration.version)).scalars())
+
+
+def run_migrations():
+    """Apply pending migrations; returns the names of those applied"""
+    applied = []
+    with db.engine.connect() as conn:
+        done = applied_versions(conn)
+    for version, name, fn in MIGRATIONS:
+        if version in done:
+            continue
+        try:
+            with db.engine.begin() as conn:
+                fn(conn)
+                conn.execute(insert(SchemaMigration).values(
+                    version=version, name=name, applied_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            # Another worker applied it first
+            continue
+        applied.append(f'{version:03d} {name}')
+    return applied
+
+
+def upgrade_database():
+    """Bring the schema up to date: create tables, then run migrations"""
+    db.create_all()
+    applied = run_migrations()
+    init_data_versions()
+    return applied
+
+
+def reset_database():
+    """Drop everything (including the FTS index) and rebuild an empty schema"""
+    with db.engine.begin() as conn:
+        drop_search_index(conn)
+    db.drop_all()
+    return upgrade_database()
@@ -1,4 +1,8 @@
+import json
+from datetime import datetime
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func
 
 db = SQLAlchemy()
 
@@ -7,9 +11,13 @@ class Team(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name_en = db.Column(db.String(100), nullable=False, unique=True)  # English name for code
     name_he = db.Column(db.String(100), nullable=False)  # Hebrew name for UI
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Differential backups
     
-    # Relationships
-    members = db.relationship('TeamMember', backref='team', lazy=True, cascade='all, delete-orphan')
+    # Relationships - members (and each member's team) are always serialized
+    # together, so load them in bulk instead of one SELECT per row
+    members = db.relationship(
+        'TeamMember', backref=db.backref('team', lazy='joined'), lazy='selectin', cascade='all, delete-orphan'
+    )
     tasks = db.relationship('Task', backref='team', lazy=True)
     
     def to_dict(self):
@@ -27,10 +35,11 @@ class Team(db.Model):
 class TeamMember(db.Model):
     """TeamMember model - represents a member of a team"""
     id = db.Column(db.Integer, primary_key=True)
-    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False)
+    team_id = db.Column(db.Integer, db.ForeignKey('team.id'), nullable=False, index=True)
     name_en = db.Column(db.String(100), nullable=False)  # English name for code (lowercase)
     name_he = db.Column(db.String(100), nullable=False)  # Hebrew name for UI
     avatar_path = db.Column(db.String(200), default='default.png')  # Relative path to avatar image
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Differential backups
     
     def to_dict(self):
         return {
@@ -46,8 +55,12 @@ class TeamMember(db.Model):
         return f'<TeamMember {self.name_en}>'
 
 
-class Task(db.Model):
-    """Task model - represents a task in a project"""
+class TaskColumns:
+    """Columns shared by active tasks (`task`) and the cold archive (`archived_task`).
+
+    Both tables draw ids from the `task` AUTOINCREMENT sequence, so a task
+    keeps its id when archive.py moves it from one table to the other.
+    """
     id = db.Column(db.Integer, primary_key=True)
     project = db.Column(db.String(100), nullable=False)
     task = db.Column(db.String(200), nullable=False)
@@ -61,35 +74,129 @@ class Task(db.Model):
     start_date = db.Column(db.Date, nullable=True)  # When task is scheduled to start
     end_date = db.Column(db.Date, nullable=True)  # When task is scheduled to end
     estimated_hours = db.Column(db.Float, nullable=True)  # Estimated work hours for workload calculations
-    is_archived = db.Column(db.Boolean, default=False, nullable=False)  # Archive status
+    is_archived = db.Column(db.Boolean, default=False, nullable=False)  # Archive status (matches the table)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Differential backups
+    # Last edit, for idle_days rules: unlike updated_at, restores and archive moves keep it
+    edited_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
-        return {
+    def to_dict(self, fields=None):
+        data = {
             'id': self.id,
             'project': self.project,
             'task': self.task,
             'members': self.members.split(',') if self.members else [],
             'status': self.status,
             'priority': self.priority,
-            'notes': self.notes,
             'team_id': self.team_id,
             'start_date': self.start_date.isoformat() if self.start_date else None,
             'end_date': self.end_date.isoformat() if self.end_date else None,
             'estimated_hours': self.estimated_hours,
-            'is_archived': self.is_archived
+            'is_archived': self.is_archived,
+            'edited_at': self.edited_at.isoformat() if self.edited_at else None
         }
+        # List views defer notes when they are not among the requested fields
+        if fields is None or 'notes' in fields:
+            data['notes'] = self.notes
+        return data
+
+
+class Task(TaskColumns, db.Model):
+    """Task model - an active task (archived ones live in ArchivedTask)"""
+    # Indexes follow the list/calendar query shapes (see migrations.py)
+    __table_args__ = (
+        db.Index('ix_task_team', 'team_id'),
+        db.Index('ix_task_status', 'status'),
+        db.Index('ix_task_project', 'project'),
+        {'sqlite_autoincrement': True},  # Never reuse the id of an archived task
+    )
+    
+    # Indexed task<->member association, kept in sync with the members string
+    member_links = db.relationship(
+        'TaskMember', primaryjoin='Task.id == foreign(TaskMember.task_id)',
+        backref='task', lazy=True, cascade='all, delete-orphan'
+    )
     
     def __repr__(self):
         return f'<Task {self.id}>'
 
 
+class ArchivedTask(TaskColumns, db.Model):
+    """ArchivedTask model - an archived task, kept out of the active table"""
+    __tablename__ = 'archived_task'
+    __table_args__ = (
+        # Archive list: ORDER BY task, id
+        db.Index('ix_archived_task_name', 'task'),
+        db.Index('ix_archived_task_team', 'team_id'),
+        db.Index('ix_archived_task_project', 'project'),
+    )
+    
+    is_archived = db.Column(db.Boolean, default=True, nullable=False)
+    
+    # task_member rows follow the task into the archive (ids are shared)
+    member_links = db.relationship(
+        'TaskMember', primaryjoin='ArchivedTask.id == foreign(TaskMember.task_id)',
+        lazy=True, cascade='all, delete-orphan', overlaps='member_links,task'
+    )
+    
+    def __repr__(self):
+        return f'<ArchivedTask {self.id}>'
+
+
+# Calendar overlap queries (calendar_range.py) filter on the effective task
+# interval. Leading with its end keeps the scan short for the usual case of
+# looking at the present: only tasks ending on/after the window are visited.
+for _model in (Task, ArchivedTask):
+    db.Index(
+        f'ix_{_model.__tablename__}_span',
+        func.coalesce(_model.end_date, _model.start_date),
+        func.coalesce(_model.start_date, _model.end_date)
+    )
+
+
+def split_members(members):
+    """Parse a comma-separated members string into unique, ordered names"""
+    names = []
+    for name in (members or '').split(','):
+        name = name.strip()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+class TaskMember(db.Model):
+    """TaskMember model - one row per member assigned to a task"""
+    __tablename__ = 'task_member'
+    __table_args__ = (
+        db.Index('ix_task_member_member_task', 'member_name', 'task_id'),
+    )
+
+    # No foreign key: the id is that of a task in either `task` or `archived_task`
+    task_id = db.Column(db.Integer, primary_key=True)
+    member_name = db.Column(db.String(100), primary_key=True)  # TeamMember.name_en
+
+    def __repr__(self):
+        return f'<TaskMember {self.task_id} {self.member_name}>'
+
+
+def _sync_member_links(task, value, oldvalue, initiator):
+    """Rebuild the association rows whenever Task.members is assigned a new value"""
+    if value == oldvalue:
+        return
+    task.member_links = [TaskMember(member_name=name) for name in split_members(value)]
+
+
+for _model in (Task, ArchivedTask):
+    event.listen(_model.members, 'set', _sync_member_links)
+
+
 class SpecialDay(db.Model):
     """SpecialDay model - represents holidays and non-working days"""
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.Date, nullable=False)
+    date = db.Column(db.Date, nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(50), default='holiday')  # 'holiday', 'company_event', 'other'
     color = db.Column(db.String(20), nullable=True)  # Hex color code
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)  # Differential backups
 
     def to_dict(self):
         return {
@@ -102,3 +209,95 @@ class SpecialDay(db.Model):
 
     def __repr__(self):
         return f'<SpecialDay {self.name} {self.date}>'
+
+
+class DataVersion(db.Model):
+    """DataVersion model - monotonic change counter per data table"""
+    table_name = db.Column(db.String(50), primary_key=True)  # 'tasks', 'teams', 'members', 'special_days'
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DataVersion {self.table_name} {self.version}>'
+
+
+class ChangeLog(db.Model):
+    """ChangeLog model - append-only log of committed row changes (id is the feed cursor)"""
+    __table_args__ = {'sqlite_autoincrement': True}  # Never reuse cursors after compaction
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # 'insert', 'update', 'delete'
+    row_ids = db.Column(db.Text, nullable=True)  # Comma-separated ids, NULL = whole table changed
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ChangeLog {self.id} {self.op} {self.table_name}>'
+
+
+class Tombstone(db.Model):
+    """Tombstone model - deleted row ids, written by triggers (see backup.py)"""
+    __table_args__ = (
+        db.Index('ix_tombstone_deleted', 'deleted_at', 'table_name'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    table_name = db.Column(db.String(50), nullable=False)  # 'tasks', 'teams', 'members', 'special_days'
+    row_id = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<Tombstone {self.table_name} {self.row_id}>'
+
+
+class Job(db.Model):
+    """Job model - progress of a background job, readable from any worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # 'archive', 'auto_archive'
+    status = db.Column(db.String(20), nullable=False, default='running')  # 'running', 'done', 'failed'
+    params = db.Column(db.Text, nullable=True)  # JSON arguments (and results) of the job
+    total = db.Column(db.Integer, nullable=False, default=0)
+    done = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    # Heartbeat: bumped with every progress update while the job runs
+    updated_at = db.Column(db.DateTime, nullable=True, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'total': self.total,
+            'done': self.done,
+            'error': self.error,
+            'params': json.loads(self.params) if self.params else None,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.kind} {self.status}>'
+
+
+class SchedulerLease(db.Model):
+    """SchedulerLease model - which worker runs a periodic job, and until when"""
+    __tablename__ = 'scheduler_lease'
+    name = db.Column(db.String(50), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)  # host:pid of the worker
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f'<SchedulerLease {self.name} {self.owner}>'
+
+
+class SchemaMigration(db.Model):
+    """SchemaMigration model - migrations already applied to this database"""
+    __tablename__ = 'schema_migrations'
+    version = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    applied_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<SchemaMigration {self.version} {self.name}>'
@@ -0,0 +1,135 @@
+"""Keyset pagination and field projection for list endpoints.
+
+    ?limit=100               at most 100 items; X-Next-Cursor is set when there are more
+    ?limit=100&cursor=<c>    the next page (pass X-Next-Cursor back as is)
+    ?fields=id,task,project  only these keys per item (id is always included)
+
+A cursor is the sort key of the last item served, so a page is found by an
+index seek instead of an OFFSET scan and stays stable while rows are
+inserted or deleted in front of it. Without limit/cursor an endpoint
+returns every matching item, as before.
+"""
+import base64
+import json
+from typing import NamedTuple, Optional
+
+from flask import request
+from sqlalchemy import tuple_, literal
+from sqlalchemy.orm import defer
+
+from models import Task
+
+MAX_PAGE_SIZE = 1000
+
+TASK_FIELDS = ('id', 'project', 'task', 'members', 'status', 'priority', 'notes', 'team_id',
+               'start_date', 'end_date', 'estimated_hours', 'is_archived', 'edited_at')
+MEMBER_FIELDS = ('id', 'team_id', 'name_en', 'name_he', 'avatar_path', 'team_name')
+
+CURSOR_HEADER = 'X-Next-Cursor'
+
+
+class ListArgsError(ValueError):
+    pass
+
+
+class ListArgs(NamedTuple):
+    fields: Optional[tuple]
+    limit: Optional[int]
+    cursor: Optional[list]
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError):
+        raise ListArgsError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ListArgsError('Invalid cursor')
+    return values
+
+
+def list_args(allowed_fields, key_size=1):
+    """Parse fields/limit/cursor from the query string"""
+    fields = None
+    raw_fields = request.args.get('fields')
+    if raw_fields:
+        requested = [name.strip() for name in raw_fields.split(',') if name.strip()]
+        unknown = [name for name in requested if name not in allowed_fields]
+        if unknown:
+            raise ListArgsError(f'Unknown fields: {", ".join(unknown)}. Allowed: {", ".join(allowed_fields)}')
+        fields = tuple(dict.fromkeys(['id'] + requested))
+
+    limit = request.args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ListArgsError('limit must be a number')
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ListArgsError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+    cursor = request.args.get('cursor')
+    cursor = decode_cursor(cursor, key_size) if cursor else None
+    return ListArgs(fields, limit, cursor)
+
+
+def project(item, fields):
+    """item restricted to fields (all of it when fields is None)"""
+    if fields is None:
+        return item
+    return {name: item[name] for name in fields if name in item}
+
+
+def task_load_options(fields, model=Task):
+    """Skip loading notes unless the response includes them"""
+    if fields is not None and 'notes' not in fields:
+        return [defer(model.notes)]
+    return []
+
+
+def keyset_page(query, columns, args):
+    """One page of an ORM query in `columns` order.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    Without limit/cursor the rows are sorted here rather than by an ORDER BY,
+    which would let SQLite walk the sort index instead of the query's own
+    filter index.
+    """
+    if args.limit is None and args.cursor is None:
+        return sorted(query.all(), key=lambda row: tuple(getattr(row, column.key) for column in columns)), None
+
+    query = query.order_by(*columns)
+    if args.cursor is not None:
+        query = query.filter(tuple_(*columns) > tuple_(*[literal(value) for value in args.cursor]))
+    if args.limit is None:
+        return query.all(), None
+
+    rows = query.limit(args.limit + 1).all()
+    if len(rows) <= args.limit:
+        return rows, None
+    rows = rows[:args.limit]
+    return rows, encode_cursor([getattr(rows[-1], column.key) for column in columns])
+
+
+def list_page(items, args, key='id'):
+    """Keyset page of an in-memory list already sorted by `key`"""
+    if args.cursor is not None:
+        after = args.cursor[0]
+        try:
+            items = [item for item in items if item[key] > after]
+        except TypeError:
+            raise ListArgsError('Invalid cursor')
+    if args.limit is None or len(items) <= args.limit:
+        return items, None
+    items = items[:args.limit]
+    return items, encode_cursor([items[-1][key]])
+
+
+def with_cursor(response, next_cursor):
+    if next_cursor:
+        response.headers[CURSOR_HEADER] = next_cursor
+    return response
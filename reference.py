@@ -0,0 +1,113 @@
+"""In-process cache of teams and members (reference data).
+
+Teams and members change rarely but nearly every page and several API
+endpoints need them. Each app keeps one immutable snapshot, tagged with
+the `teams` and `members` data versions it was built from. A lookup reads
+those two counters (one tiny indexed query) and rebuilds the snapshot only
+when they moved. The counters are bumped in the same transaction as any
+team/member write, by any worker process, so a snapshot is never served
+after a committed change is visible.
+
+Snapshots hold the models' to_dict() output. Treat them as read-only.
+"""
+import threading
+from dataclasses import dataclass, field
+
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Team, TeamMember, DataVersion
+
+REFERENCE_TABLES = ('teams', 'members')
+EXTENSION_KEY = 'reference_cache'
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    version: tuple
+    teams: list = field(default_factory=list)  # Team.to_dict(), by id
+    members: list = field(default_factory=list)  # TeamMember.to_dict(), by id
+    teams_by_id: dict = field(default_factory=dict)
+    members_by_name: dict = field(default_factory=dict)  # name_en -> member
+
+    def team_members(self, team_id):
+        """Members of a team, or None if the team does not exist"""
+        team = self.teams_by_id.get(team_id)
+        return team['members'] if team else None
+
+    def members_by_team(self):
+        """Members ordered by team, then id"""
+        return sorted(self.members, key=lambda member: (member['team_id'], member['id']))
+
+
+class ReferenceCache:
+    def __init__(self):
+        self._data = None
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        version = reference_version(session)
+        data = self._data
+        if data is not None and data.version == version:
+            return data
+        with self._lock:
+            # Another thread may have rebuilt it while we waited
+            data = self._data
+            if data is None or data.version != version:
+                data = self._data = load_reference_data(session, version)
+        return data
+
+
+def reference_version(session):
+    rows = session.execute(
+        select(DataVersion.table_name, DataVersion.version)
+        .where(DataVersion.table_name.in_(REFERENCE_TABLES))
+    ).all()
+    versions = dict(rows)
+    return tuple(versions.get(table, 0) for table in REFERENCE_TABLES)
+
+
+def load_reference_data(session, version):
+    # Read after the version so a concurrent write can only make the
+    # snapshot newer than its tag (and trigger one extra rebuild), never older
+    teams = session.execute(select(Team).order_by(Team.id)).scalars().all()
+    members = session.execute(select(TeamMember).order_by(TeamMember.id)).scalars().all()
+    team_names = {team.id: team.name_he for team in teams}
+
+    member_dicts = []
+    for member in members:
+        # Same shape as TeamMember.to_dict(), without a lazy load per member
+        member_dicts.append({
+            'id': member.id,
+            'team_id': member.team_id,
+            'name_en': member.name_en,
+            'name_he': member.name_he,
+            'avatar_path': member.avatar_path,
+            'team_name': team_names.get(member.team_id, '')
+        })
+
+    members_of = {team.id: [] for team in teams}
+    for member in member_dicts:
+        members_of.setdefault(member['team_id'], []).append(member)
+    team_dicts = [
+        {'id': team.id, 'name_en': team.name_en, 'name_he': team.name_he, 'members': members_of[team.id]}
+        for team in teams
+    ]
+
+    return ReferenceData(
+        version=version,
+        teams=team_dicts,
+        members=member_dicts,
+        teams_by_id={team['id']: team for team in team_dicts},
+        # First member wins when a name_en is reused across teams
+        members_by_name={m['name_en']: m for m in reversed(member_dicts)},
+    )
+
+
+def init_reference_cache(app):
+    app.extensions[EXTENSION_KEY] = ReferenceCache()
+
+
+def reference_data():
+    """Current teams/members snapshot for the active app"""
+    return current_app.extensions[EXTENSION_KEY].get(db.session)
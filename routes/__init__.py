@@ -0,0 +1,18 @@
+"""Route blueprints, registered by create_app()"""
+from routes import pages, stream, tasks, teams, calendar, special_days, backups, jobs
+
+BLUEPRINTS = (
+    pages.bp,
+    stream.bp,
+    tasks.bp,
+    teams.bp,
+    calendar.bp,
+    special_days.bp,
+    backups.bp,
+    jobs.bp,
+)
+
+
+def register_blueprints(app):
+    for blueprint in BLUEPRINTS:
+        app.register_blueprint(blueprint)
@@ -0,0 +1,176 @@
+"""Backup and restore API: table exports and whole-database snapshots"""
+import json
+import os
+import shutil
+import tempfile
+
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context
+
+from models import db
+from backup import (backup_tables, export_stream, export_filename, EXPORT_FORMATS, parse_backup_id, diff_horizon,
+                    restore_chain, RestoreError)
+from snapshot import (snapshots_supported, take_snapshot, snapshot_stream, snapshot_filename,
+                      save_upload, validate_snapshot, restore_snapshot, remove_snapshot, SnapshotError)
+from changes import read_versions, global_version
+
+bp = Blueprint('backups', __name__)
+
+# ============ BACKUP & RESTORE API ============
+
+@bp.route('/api/backup/snapshot', methods=['GET'])
+def api_backup_snapshot():
+    """Download a consistent copy of the whole SQLite database.
+    
+    Query: gzip=0 to download it uncompressed.
+    """
+    if not snapshots_supported():
+        return jsonify({'error': 'Snapshots require an SQLite database file'}), 400
+    compress = request.args.get('gzip', '1').lower() not in ('0', 'false', 'no')
+    
+    path = take_snapshot()
+    response = Response(
+        snapshot_stream(path, compress),
+        mimetype='application/gzip' if compress else 'application/vnd.sqlite3'
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={snapshot_filename(compress)}'
+    if not compress:
+        response.headers['Content-Length'] = str(os.path.getsize(path))
+    return response
+
+
+@bp.route('/api/backup/<string:table_name>', methods=['GET'])
+def api_backup_table(table_name):
+    """Export table data as a streamed JSON (default) or NDJSON download.
+    
+    Query: format=json|ndjson, gzip=1 to compress on the fly, since=<backup_id>
+    for a differential backup (rows written and ids deleted since then).
+    """
+    fmt = request.args.get('format', 'json')
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    since = request.args.get('since')
+    
+    if backup_tables(table_name) is None:
+        return jsonify({'error': 'Invalid table name'}), 400
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f'Invalid format, expected one of: {", ".join(EXPORT_FORMATS)}'}), 400
+    if since:
+        try:
+            since = parse_backup_id(since)
+        except ValueError:
+            return jsonify({'error': 'since must be a backup_id or a Unix timestamp'}), 400
+        if since < diff_horizon():
+            return jsonify({'error': 'since is older than the deletion history; take a full backup'}), 400
+    else:
+        since = None
+    
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'application/json'
+    response = Response(
+        stream_with_context(export_stream(table_name, fmt, compress, since)),
+        mimetype='application/gzip' if compress else mimetype
+    )
+    response.headers['Content-Disposition'] = f'attachment; filename={export_filename(table_name, fmt, compress, since)}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@bp.route('/api/restore/snapshot', methods=['POST'])
+def api_restore_snapshot():
+    """Replace the whole database with an uploaded snapshot (atomic)"""
+    request.max_content_length = current_app.config['MAX_RESTORE_LENGTH']
+    
+    if not snapshots_supported():
+        return jsonify({'success': False, 'error': 'Snapshots require an SQLite database file'}), 400
+    if 'file' not in request.files:
+        return jsonify({'success': False, 'error': 'No file part'}), 400
+    file = request.files['file']
+    if file.filename == '':
+        return jsonify({'success': False, 'error': 'No selected file'}), 400
+    
+    path = None
+    try:
+        path = save_upload(file.stream)
+        validate_snapshot(path)
+        restore_snapshot(path)
+    except SnapshotError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    finally:
+        if path:
+            remove_snapshot(path)
+    
+    return jsonify({'success': True, 'version': global_version(read_versions(db.session))})
+
+
+@bp.route('/api/restore/<string:table_name>', methods=['POST'])
+def api_restore_table(table_name):
+    """Import a JSON or NDJSON backup (optionally gzipped) in bulk batches.
+    
+    Several files (a full backup plus differential backups) are applied in
+    chain order in one transaction.
+    
+    Query: progress=1 streams NDJSON progress lines ({table, restored}),
+    the last line being the result.
+    """
+    # Backups may be far larger than avatar uploads
+    request.max_content_length = current_app.config['MAX_RESTORE_LENGTH']
+    
+    if 'file' not in request.files:
+        return jsonify({'success': False, 'error': 'No file part'}), 400
+        
+    files = request.files.getlist('file')
+    if any(file.filename == '' for file in files):
+        return jsonify({'success': False, 'error': 'No selected file'}), 400
+    
+    if backup_tables(table_name) is None:
+        return jsonify({'success': False, 'error': 'Invalid table name'}), 400
+    
+    restored_counts = {}
+    streams = [file.stream for file in files]
+    progress_requested = request.args.get('progress', '').lower() in ('1', 'true', 'yes')
+    if progress_requested:
+        # The uploads are closed when the view returns; keep copies for the stream
+        streams = []
+        for file in files:
+            stream = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+            shutil.copyfileobj(file.stream, stream)
+            stream.seek(0)
+            streams.append(stream)
+    batches = restore_chain(streams, table_name, restored_counts)
+    
+    def result():
+        if not restored_counts:
+            return {'success': True, 'message': 'No data to restore', 'count': 0}
+        return {'success': True, 'counts': restored_counts}
+    
+    if not progress_requested:
+        try:
+            for progress in batches:
+                current_app.logger.debug('Restore %s: %s', table_name, progress)
+            db.session.commit()
+        except RestoreError as e:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify(result())
+    
+    def generate():
+        try:
+            for progress in batches:
+                yield json.dumps(progress) + '\n'
+            db.session.commit()
+            outcome = result()
+        except Exception as e:
+            db.session.rollback()
+            outcome = {'success': False, 'error': str(e)}
+        finally:
+            for stream in streams:
+                stream.close()
+        yield json.dumps(outcome) + '\n'
+    
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,255 @@
+"""Calendar API: date ranges, workload and task scheduling"""
+from calendar import monthrange
+from datetime import datetime, timedelta
+
+from flask import Blueprint, request, jsonify, abort
+from sqlalchemy.orm import defer
+
+from models import db, split_members
+from calendar_range import tasks_in_range, range_model, MAX_RANGE_DAYS
+from archive import get_task
+from workload import workload_members, compute_workload
+from conditional import conditional_get
+from pagination import TASK_FIELDS, ListArgsError, list_args, project, task_load_options, list_page, with_cursor
+
+bp = Blueprint('calendar', __name__)
+
+
+def _page_tasks(query, model):
+    """Tasks of a calendar query, paged and projected per limit/cursor/fields.
+
+    A range holds few tasks, so they are read through the span index and
+    paged in memory; an ORDER BY id would have SQLite scan the table in
+    rowid order instead.
+    """
+    args = list_args(TASK_FIELDS)
+    tasks = sorted(query.options(*task_load_options(args.fields, model)), key=lambda task: task.id)
+    items, next_cursor = list_page([task.to_dict(args.fields) for task in tasks], args)
+    return [project(item, args.fields) for item in items], next_cursor
+
+
+# ============ CALENDAR API (v3) ============
+
+@bp.route('/api/calendar/range', methods=['GET'])
+@conditional_get('tasks', 'teams', 'members')
+def api_calendar_range():
+    """Get tasks overlapping an arbitrary date range (week, month, quarter, year)"""
+    
+    team_id = request.args.get('team_id')
+    try:
+        start = datetime.fromisoformat(request.args['start']).date()
+        end = datetime.fromisoformat(request.args['end']).date()
+    except (KeyError, ValueError):
+        return jsonify({'error': 'start and end dates are required (YYYY-MM-DD)'}), 400
+    
+    if end < start:
+        return jsonify({'error': 'end must not be before start'}), 400
+    if (end - start).days > MAX_RANGE_DAYS:
+        return jsonify({'error': f'Range is limited to {MAX_RANGE_DAYS} days'}), 400
+    
+    try:
+        tasks, next_cursor = _page_tasks(tasks_in_range(start, end, team_id), range_model(team_id))
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return with_cursor(jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'tasks': tasks
+    }), next_cursor)
+
+
+@bp.route('/api/calendar/week', methods=['GET'])
+@conditional_get('tasks', 'teams', 'members')
+def api_calendar_week():
+    """Get tasks for a specific week"""
+    
+    # Get date parameter (defaults to today)
+    date_str = request.args.get('date')
+    team_id = request.args.get('team_id')
+    
+    if date_str:
+        try:
+            reference_date = datetime.fromisoformat(date_str).date()
+        except ValueError:
+            reference_date = datetime.now().date()
+    else:
+        reference_date = datetime.now().date()
+    
+    # Calculate week start (Sunday) and end (Saturday)
+    days_since_sunday = (reference_date.weekday() + 1) % 7
+    week_start = reference_date - timedelta(days=days_since_sunday)
+    week_end = week_start + timedelta(days=6)
+    
+    # Query tasks that overlap this week
+    try:
+        tasks, next_cursor = _page_tasks(tasks_in_range(week_start, week_end, team_id), range_model(team_id))
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return with_cursor(jsonify({
+        'week_start': week_start.isoformat(),
+        'week_end': week_end.isoformat(),
+        'tasks': tasks
+    }), next_cursor)
+
+
+@bp.route('/api/calendar/month', methods=['GET'])
+@conditional_get('tasks', 'teams', 'members')
+def api_calendar_month():
+    """Get tasks for a specific month"""
+    
+    # Get month/year parameters (defaults to current month)
+    year = request.args.get('year', type=int)
+    month = request.args.get('month', type=int)
+    team_id = request.args.get('team_id')
+    
+    now = datetime.now()
+    if not year:
+        year = now.year
+    if not month:
+        month = now.month
+    
+    # Calculate month boundaries
+    month_start = datetime(year, month, 1).date()
+    last_day = monthrange(year, month)[1]
+    month_end = datetime(year, month, last_day).date()
+    
+    # Query tasks that overlap this month
+    try:
+        tasks, next_cursor = _page_tasks(tasks_in_range(month_start, month_end, team_id), range_model(team_id))
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return with_cursor(jsonify({
+        'month': month,
+        'year': year,
+        'month_start': month_start.isoformat(),
+        'month_end': month_end.isoformat(),
+        'tasks': tasks
+    }), next_cursor)
+
+
+@bp.route('/api/calendar/workload', methods=['GET'])
+@conditional_get('tasks', 'teams', 'members')
+def api_calendar_workload():
+    """Get member workload data for a date range"""
+    
+    # Get date range parameters
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    team_id = request.args.get('team_id')
+    
+    # Default to current week if not specified
+    if not start_date_str or not end_date_str:
+        today = datetime.now().date()
+        days_since_sunday = (today.weekday() + 1) % 7
+        start_date = today - timedelta(days=days_since_sunday)
+        end_date = start_date + timedelta(days=6)
+    else:
+        try:
+            start_date = datetime.fromisoformat(start_date_str).date()
+            end_date = datetime.fromisoformat(end_date_str).date()
+        except ValueError:
+            return jsonify({'error': 'Invalid date format'}), 400
+    
+    try:
+        fields = list_args(TASK_FIELDS).fields
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Tasks overlapping the range, in the selected filter scope
+    tasks = tasks_in_range(start_date, end_date, team_id).options(*task_load_options(fields, range_model(team_id))).all()
+    members = workload_members(team_id, tasks)
+    
+    # Index tasks by assigned member once instead of scanning per member
+    tasks_by_member = {}
+    for task in tasks:
+        task_dict = project(task.to_dict(fields), fields)
+        for name in split_members(task.members):
+            tasks_by_member.setdefault(name, []).append(task_dict)
+    
+    # Build workload data structure
+    workload_data = []
+    for member in members:
+        workload_data.append({
+            'member': member,
+            'tasks': tasks_by_member.get(member['name_en'], [])
+        })
+    
+    return jsonify({
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'workload': workload_data
+    })
+
+
+@bp.route('/api/calendar/workload/hours', methods=['GET'])
+@conditional_get('tasks', 'teams', 'members', 'special_days')
+def api_calendar_workload_hours():
+    """Get allocated hours per member per day for a date range"""
+    
+    team_id = request.args.get('team_id')
+    try:
+        start_date = datetime.fromisoformat(request.args['start_date']).date()
+        end_date = datetime.fromisoformat(request.args['end_date']).date()
+    except (KeyError, ValueError):
+        return jsonify({'error': 'start_date and end_date are required (YYYY-MM-DD)'}), 400
+    
+    if end_date < start_date:
+        return jsonify({'error': 'end_date must not be before start_date'}), 400
+    if (end_date - start_date).days > MAX_RANGE_DAYS:
+        return jsonify({'error': f'Range is limited to {MAX_RANGE_DAYS} days'}), 400
+    
+    # Only dates, hours and members are needed
+    tasks = tasks_in_range(start_date, end_date, team_id).options(defer(range_model(team_id).notes)).all()
+    members = workload_members(team_id, tasks)
+    days, working, hours, counts = compute_workload(tasks, members, start_date, end_date)
+    
+    return jsonify({
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'days': days,
+        'working': working,
+        'members': members,
+        'hours': hours,
+        'task_counts': counts
+    })
+
+
+@bp.route('/api/tasks/<int:id>/schedule', methods=['PUT'])
+def api_update_task_schedule(id):
+    """Update task scheduling information (dates and estimated hours)"""
+    
+    task = get_task(db.session, id) or abort(404)
+    data = request.json
+    
+    # Update start_date
+    if 'start_date' in data:
+        start_date = data.get('start_date')
+        if start_date:
+            try:
+                task.start_date = datetime.fromisoformat(start_date).date()
+            except (ValueError, AttributeError):
+                return jsonify({'success': False, 'error': 'Invalid start_date format'}), 400
+        else:
+            task.start_date = None
+    
+    # Update end_date
+    if 'end_date' in data:
+        end_date = data.get('end_date')
+        if end_date:
+            try:
+                task.end_date = datetime.fromisoformat(end_date).date()
+            except (ValueError, AttributeError):
+                return jsonify({'success': False, 'error': 'Invalid end_date format'}), 400
+        else:
+            task.end_date = None
+    
+    # Update estimated_hours
+    if 'estimated_hours' in data:
+        task.estimated_hours = data.get('estimated_hours')
+    
+    db.session.commit()
+    
+    return jsonify({'success': True, 'task': task.to_dict()})
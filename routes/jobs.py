@@ -0,0 +1,28 @@
+"""Background job progress"""
+from flask import Blueprint, request, jsonify, current_app
+
+from models import db, Job
+from bulk_archive import recover_stale_job
+
+bp = Blueprint('jobs', __name__)
+
+MAX_JOBS = 100
+
+@bp.route('/api/jobs', methods=['GET'])
+def api_list_jobs():
+    """Most recent jobs first, e.g. ?kind=auto_archive for the auto-archive runs"""
+    query = Job.query.order_by(Job.id.desc())
+    kind = request.args.get('kind')
+    if kind:
+        query = query.filter(Job.kind == kind)
+    limit = min(max(request.args.get('limit', 20, type=int), 1), MAX_JOBS)
+    return jsonify([job.to_dict() for job in query.limit(limit)])
+
+@bp.route('/api/jobs/<int:id>', methods=['GET'])
+def api_get_job(id):
+    """A job's progress; a running job whose worker is gone is taken over first"""
+    job = db.session.get(Job, id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    job = recover_stale_job(current_app._get_current_object(), db.session, job)
+    return jsonify(job.to_dict())
@@ -0,0 +1,190 @@
+"""HTML pages and uploaded files"""
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, jsonify, send_from_directory
+from sqlalchemy import case, select, func
+
+from models import db, Task, TaskMember
+from archive import task_model
+from search import task_search_filter
+from reference import reference_data
+from fragments import project_signatures, project_fragments
+
+bp = Blueprint('pages', __name__)
+
+# Route to serve uploaded files
+@bp.route('/uploads/<path:filename>')
+def uploaded_file(filename):
+    """Serve uploaded files from the uploads directory"""
+    return send_from_directory('uploads', filename)
+
+@bp.app_context_processor
+def inject_now():
+    return {'now': datetime.now()}
+
+
+def _board():
+    """Project cards of the dashboard for the current request's filters"""
+    project_filter = request.args.get('project')
+    member_filter = request.args.get('member')
+    team_filter = request.args.get('team')
+    query_str = request.args.get('q', '').strip()
+    mode = request.args.get('mode', 'active') # 'active' or 'archive'
+
+    # Archived tasks live in their own table
+    model = task_model(mode == 'archive')
+
+    # Order by priority (high, medium, low, none)
+    priority_order = case(
+        (model.priority == 'high', 1),
+        (model.priority == 'medium', 2),
+        (model.priority == 'low', 3),
+        (model.priority == 'none', 4),
+    )
+    
+    # Base query
+    query = model.query.order_by(priority_order, model.project, model.id)
+
+    # Search Logic
+    if query_str:
+        query = query.filter(task_search_filter(query_str, model))
+
+    if project_filter:
+        query = query.filter(model.project == project_filter)
+    if member_filter:
+        query = query.filter(model.member_links.any(TaskMember.member_name == member_filter))
+    
+    # Team filtering context
+    active_team_id = None
+    active_team_members = []
+    reference = reference_data()
+    
+    if team_filter and team_filter.isdigit():
+        active_team_id = int(team_filter)
+        # Team members for relaxed filtering (Team OR Member)
+        active_team_members = [m['name_en'] for m in reference.team_members(active_team_id) or []]
+
+    # Only projects with matching tasks are shown
+    signatures = project_signatures(query, model)
+    projects = sorted(signatures)
+    
+    # Map each project to the team of its first task, in one grouped query
+    first_task_ids = select(func.min(model.id)).where(model.project.in_(projects)).group_by(model.project)
+    project_teams = {project: None for project in projects}
+    for project, team_id in db.session.query(model.project, model.team_id).filter(model.id.in_(first_task_ids)):
+        team = reference.teams_by_id.get(team_id)
+        project_teams[project] = team['name_he'] if team else None
+
+    # Project sections are cached; only those whose tasks changed are rendered
+    return project_fragments(
+        '_project_card.html', query, model, signatures,
+        key=(reference.version, query_str, project_filter, member_filter, active_team_id),
+        project_keys=project_teams, project_teams=project_teams, active_team_id=active_team_id,
+        active_team_members=active_team_members, members_by_name=reference.members_by_name
+    )
+
+
+@bp.route('/')
+def index():
+    reference = reference_data()
+    team_filter = request.args.get('team')
+    return render_template('index.html', project_cards=_board(), members=reference.members_by_team(),
+                           teams=reference.teams,
+                           active_team_id=int(team_filter) if team_filter and team_filter.isdigit() else None,
+                           q=request.args.get('q', '').strip(), mode=request.args.get('mode', 'active'))
+
+
+@bp.route('/partials/project-cards')
+def project_cards():
+    """Dashboard cards in order; HTML only for those whose key the client does not have.
+
+    Takes the dashboard's query string plus have=<key>,<key>,... (the
+    data-fragment-key of the cards on the page).
+    """
+    have = set(request.args.get('have', '').split(','))
+    return jsonify({'cards': [
+        {'project': card.project, 'key': card.key, 'html': None if card.key in have else str(card.html)}
+        for card in _board()
+    ]})
+
+
+@bp.route('/print')
+def print_view():
+    project_filter = request.args.get('project')
+    member_filter = request.args.get('member')
+    team_filter = request.args.get('team')
+    status_filter = request.args.get('status')
+    priority_filter = request.args.get('priority')
+
+    # Base query for filtering (active tasks only)
+    query = Task.query
+
+    # Apply filters that limit the SCOPE of projects (Team, Member, Status, Priority)
+    # We apply these FIRST so we can get the list of relevant projects.
+    if member_filter:
+        query = query.filter(Task.member_links.any(TaskMember.member_name == member_filter))
+    if team_filter:
+        query = query.filter(Task.team_id == team_filter)
+    if status_filter and status_filter != 'all':
+        query = query.filter(Task.status == status_filter)
+    if priority_filter and priority_filter != 'all':
+        query = query.filter(Task.priority == priority_filter)
+    
+    # Helper to get distinct projects from the currently filtered scope
+    # This list allows switching between projects that match the other criteria
+    # e.g. If specific Team is selected, only show projects from that Team.
+    available_projects_query = query.with_entities(Task.project).distinct()
+    available_projects = sorted([p[0] for p in available_projects_query.all()])
+
+    # Now apply the specific project filter if selected
+    if project_filter:
+        query = query.filter(Task.project == project_filter)
+
+    # Apply ordering for display
+    priority_order = case(
+        (Task.priority == 'high', 1),
+        (Task.priority == 'medium', 2),
+        (Task.priority == 'low', 3),
+        (Task.priority == 'none', 4),
+    )
+    query = query.order_by(priority_order, Task.project, Task.id)
+
+    # One cached section per project with matching tasks; repeated reports
+    # only render the projects whose tasks changed
+    reference = reference_data()
+    project_sections = project_fragments(
+        '_print_project.html', query, Task, project_signatures(query, Task),
+        key=(reference.version, project_filter, member_filter, team_filter, status_filter, priority_filter),
+        members_by_name=reference.members_by_name, teams_by_id=reference.teams_by_id
+    )
+    
+    return render_template('printable.html', project_sections=project_sections, all_projects=available_projects,
+                           teams=reference.teams)
+
+
+@bp.route('/table-editor')
+def table_editor():
+    """Table editor for quick task management"""
+    reference = reference_data()
+    tasks = [task.to_dict() for task in Task.query.all()]
+    return render_template('table_editor.html', teams=reference.teams, members=reference.members, tasks=tasks)
+
+
+@bp.route('/calendar')
+def calendar():
+    """Calendar page for week/month planning"""
+    reference = reference_data()
+    return render_template('calendar.html', teams=reference.teams, members=reference.members)
+
+
+@bp.route('/admin')
+def admin():
+    """Admin page for managing teams and members"""
+    return render_template('admin.html', teams=reference_data().teams)
+
+
+@bp.route('/archive')
+def archive():
+    """Page to view and restore archived tasks"""
+    reference = reference_data()
+    return render_template('archive.html', teams=reference.teams, members=reference.members)
@@ -0,0 +1,63 @@
+"""Special days (holidays, events) API"""
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify
+
+from models import db, SpecialDay
+from conditional import conditional_get
+
+bp = Blueprint('special_days', __name__)
+
+# ============ SPECIAL DAYS API ============
+
+@bp.route('/api/special-days', methods=['GET'])
+@conditional_get('special_days')
+def api_get_special_days():
+    
+    start_date_str = request.args.get('start_date')
+    end_date_str = request.args.get('end_date')
+    
+    query = SpecialDay.query
+    
+    if start_date_str and end_date_str:
+        try:
+            start_date = datetime.fromisoformat(start_date_str).date()
+            end_date = datetime.fromisoformat(end_date_str).date()
+            query = query.filter(SpecialDay.date.between(start_date, end_date))
+        except ValueError:
+            pass
+            
+    special_days = query.order_by(SpecialDay.date).all()
+    return jsonify([day.to_dict() for day in special_days])
+
+@bp.route('/api/special-days', methods=['POST'])
+def api_create_special_day():
+    data = request.json
+    
+    try:
+        date_obj = datetime.fromisoformat(data['date']).date()
+    except (ValueError, KeyError):
+        return jsonify({'success': False, 'error': 'Invalid date'}), 400
+        
+    name = data.get('name')
+    if not name:
+        return jsonify({'success': False, 'error': 'Name is required'}), 400
+        
+    special_day = SpecialDay(
+        date=date_obj,
+        name=name,
+        type=data.get('type', 'holiday'),
+        color=data.get('color')
+    )
+    
+    db.session.add(special_day)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'special_day': special_day.to_dict()})
+
+@bp.route('/api/special-days/<int:id>', methods=['DELETE'])
+def api_delete_special_day(id):
+    day = SpecialDay.query.get_or_404(id)
+    db.session.delete(day)
+    db.session.commit()
+    return jsonify({'success': True})
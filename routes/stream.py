@@ -0,0 +1,145 @@
+"""Data version and change stream API (SSE, long-poll, row deltas)
+
+An open stream or long poll holds a worker thread (gthread workers), so
+each worker serves at most STREAM_LIMIT of them at a time, by default half
+its threads; the other half always stays free for requests. Clients over
+the limit get 204 (SSE, which makes EventSource stop reconnecting) or 503
+with Retry-After (long poll) and poll /api/version instead.
+"""
+import json
+import threading
+
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context
+
+from models import db
+from database import setting, DEFAULT_POOL_SIZE
+from changes import broadcaster, read_versions, global_version, changes_since
+
+bp = Blueprint('stream', __name__)
+
+# Change stream tuning (seconds)
+STREAM_KEEPALIVE = 15
+LONG_POLL_TIMEOUT = 25
+CHANGE_WATCH_INTERVAL = 1
+VERSION_POLL_INTERVAL = 10  # suggested to clients over the stream limit
+
+
+class StreamSlots:
+    """Counts the open streams of this worker process"""
+    def __init__(self):
+        self.open = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, limit):
+        with self._lock:
+            if self.open >= limit:
+                return False
+            self.open += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.open -= 1
+
+
+stream_slots = StreamSlots()
+
+
+def stream_limit():
+    """Streams one worker may hold open: STREAM_LIMIT, by default half of WEB_THREADS"""
+    threads = int(setting(current_app.config, 'WEB_THREADS', DEFAULT_POOL_SIZE))
+    return int(setting(current_app.config, 'STREAM_LIMIT', max(threads // 2, 1)))
+
+
+@bp.route('/api/version')
+def api_version():
+    """Current data version, overall and per table"""
+    versions = read_versions(db.session)
+    response = jsonify({'version': global_version(versions), 'tables': versions})
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    return response
+
+
+# ============ CHANGE STREAM API ============
+
+def _format_sse(notice):
+    return f"id: {notice['version']}\nevent: change\ndata: {json.dumps(notice)}\n\n"
+
+@bp.route('/api/stream')
+def api_stream():
+    """Server-Sent Events stream of change notices"""
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('version')
+    try:
+        version = int(last_id)
+    except (TypeError, ValueError):
+        version = None
+
+    broadcaster.start_watcher(current_app._get_current_object(), CHANGE_WATCH_INTERVAL)
+    if not stream_slots.acquire(stream_limit()):
+        # No thread to spare: the client falls back to polling /api/version
+        return Response(status=204, headers={'Retry-After': str(VERSION_POLL_INTERVAL)})
+
+    if version is None:
+        version = broadcaster.version
+
+    def generate(version):
+        yield 'retry: 5000\n\n'
+        # Tell the client where it stands so a reconnect can resume from here
+        yield f"event: hello\ndata: {json.dumps({'version': broadcaster.version})}\n\n"
+        while True:
+            notices = broadcaster.wait(version, timeout=STREAM_KEEPALIVE)
+            if notices is None:
+                # Missed notices were dropped from history - force a full refresh
+                version = broadcaster.version
+                yield f"id: {version}\nevent: reset\ndata: {json.dumps({'version': version})}\n\n"
+            elif notices:
+                for notice in notices:
+                    yield _format_sse(notice)
+                version = notices[-1]['version']
+            else:
+                yield ': keepalive\n\n'
+
+    try:
+        response = Response(stream_with_context(generate(version)), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        # The server closes the response when the client disconnects
+        response.call_on_close(stream_slots.release)
+    except Exception:
+        stream_slots.release()
+        raise
+    return response
+
+@bp.route('/api/stream/poll')
+def api_stream_poll():
+    """Long-poll fallback for clients without EventSource support"""
+    version = request.args.get('version', type=int)
+    broadcaster.start_watcher(current_app._get_current_object(), CHANGE_WATCH_INTERVAL)
+    if version is None:
+        return jsonify({'version': broadcaster.version, 'changes': []})
+
+    if not stream_slots.acquire(stream_limit()):
+        response = jsonify({'error': 'Too many open change streams, poll /api/version'})
+        response.headers['Retry-After'] = str(VERSION_POLL_INTERVAL)
+        return response, 503
+    try:
+        notices = broadcaster.wait(version, timeout=LONG_POLL_TIMEOUT)
+    finally:
+        stream_slots.release()
+    if notices is None:
+        return jsonify({'version': broadcaster.version, 'reset': True, 'changes': []})
+
+    changes = [change for notice in notices for change in notice['changes']]
+    new_version = notices[-1]['version'] if notices else version
+    response = jsonify({'version': new_version, 'changes': changes})
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    return response
+
+@bp.route('/api/changes')
+def api_changes():
+    """Row-level delta since a change log cursor"""
+    since = request.args.get('since', type=int)
+    limit = min(max(request.args.get('limit', 1000, type=int), 1), 5000)
+    response = jsonify(changes_since(db.session, since, limit))
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    return response
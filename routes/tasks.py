@@ -0,0 +1,222 @@
+"""Task API: create, edit, archive, delete and search"""
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify, current_app, abort
+
+from models import db, Task, ArchivedTask
+from archive import get_task, move_tasks
+from search import search_tasks
+from task_batch import apply_batch, MAX_BATCH_OPERATIONS
+from bulk_archive import (BulkArchiveError, SYNC_LIMIT, parse_filter, count_matching, set_archived,
+                          start_archive_job)
+from pagination import (TASK_FIELDS, ListArgsError, list_args, project, task_load_options, keyset_page,
+                        encode_cursor, with_cursor)
+from conditional import conditional_get
+
+bp = Blueprint('tasks', __name__)
+
+# API endpoint to add a task (AJAX)
+@bp.route('/api/tasks', methods=['POST'])
+def api_add_task():
+    data = request.json
+    project = data.get('project')
+    if not project or not project.strip():
+        project = "ללא פרויקט"
+        
+    task = data.get('task')
+    if not task or not task.strip():
+        task = "ללא שם"
+    members = ','.join(data.get('members', []))
+    status = data.get('status')
+    priority = data.get('priority', 'none')
+    notes = data.get('notes', '')
+    team_id = data.get('team_id')
+    
+    # Calendar fields (v3)
+    start_date = data.get('start_date')
+    end_date = data.get('end_date')
+    estimated_hours = data.get('estimated_hours')
+    
+    # Parse date strings to date objects if provided
+    if start_date and start_date.strip():
+        try:
+            start_date = datetime.fromisoformat(start_date).date()
+        except (ValueError, AttributeError):
+            start_date = None
+    else:
+        start_date = None
+        
+    if end_date and end_date.strip():
+        try:
+            end_date = datetime.fromisoformat(end_date).date()
+        except (ValueError, AttributeError):
+            end_date = None
+    else:
+        end_date = None
+            
+    new_task = Task(
+        project=project, 
+        task=task, 
+        members=members, 
+        status=status, 
+        priority=priority, 
+        notes=notes, 
+        team_id=team_id,
+        start_date=start_date,
+        end_date=end_date,
+        estimated_hours=estimated_hours
+    )
+    db.session.add(new_task)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'id': new_task.id})
+
+# API endpoint to apply many task changes in one transaction
+@bp.route('/api/tasks/batch', methods=['POST'])
+def api_batch_tasks():
+    """Create/update/archive/delete tasks in bulk; one result per operation"""
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list):
+        return jsonify({'success': False, 'error': 'operations must be a list'}), 400
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        return jsonify({'success': False, 'error': f'A batch is limited to {MAX_BATCH_OPERATIONS} operations'}), 400
+    
+    try:
+        results = apply_batch(db.session, operations)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    return jsonify({'success': all(result['success'] for result in results), 'results': results})
+
+# API endpoint to archive/unarchive every task matching a filter
+@bp.route('/api/tasks/bulk-archive', methods=['POST'])
+def api_bulk_archive():
+    """Archive (or with "archive": false, unarchive) matching tasks.
+
+    Small sets are done in this request; large ones start a background job
+    (202 with the job, poll GET /api/jobs/<id>). "dry_run": true only counts.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'A JSON object is required'}), 400
+    try:
+        criteria = parse_filter(data.get('filter'))
+    except BulkArchiveError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    archive = bool(data.get('archive', True))
+    
+    total = count_matching(db.session, criteria, archive)
+    if data.get('dry_run'):
+        return jsonify({'success': True, 'count': total})
+    
+    if total > SYNC_LIMIT or data.get('background'):
+        job = start_archive_job(current_app._get_current_object(), db.session, criteria, archive, total)
+        return jsonify({'success': True, 'job': job.to_dict()}), 202
+    
+    ids = set_archived(db.session, criteria, archive)
+    db.session.commit()
+    return jsonify({'success': True, 'count': len(ids)})
+
+# API endpoint to edit a task (AJAX)
+@bp.route('/api/tasks/<int:id>', methods=['PUT'])
+def api_edit_task(id):
+    task = get_task(db.session, id) or abort(404)
+    data = request.json
+    task.project = data.get('project', task.project)
+    task.task = data.get('task', task.task)
+    if 'members' in data:
+        task.members = ','.join(data['members'])
+    task.status = data.get('status', task.status)
+    task.priority = data.get('priority', task.priority)
+    task.notes = data.get('notes', task.notes)
+    task.team_id = data.get('team_id', task.team_id)
+    
+    # Handle calendar fields (v3)
+    if 'start_date' in data:
+        start_date = data.get('start_date')
+        if start_date:
+            try:
+                task.start_date = datetime.fromisoformat(start_date).date()
+            except (ValueError, AttributeError):
+                pass
+        else:
+            task.start_date = None
+    
+    if 'end_date' in data:
+        end_date = data.get('end_date')
+        if end_date:
+            try:
+                task.end_date = datetime.fromisoformat(end_date).date()
+            except (ValueError, AttributeError):
+                pass
+        else:
+            task.end_date = None
+    
+    if 'estimated_hours' in data:
+        task.estimated_hours = data.get('estimated_hours')
+
+    # Handle archiving: the task moves to the other table
+    if 'is_archived' in data and bool(data['is_archived']) != task.is_archived:
+        move_tasks(db.session, [task.id], bool(data['is_archived']))
+    
+    db.session.commit()
+    
+    return jsonify({'success': True})
+
+# API endpoint to get archived tasks
+@bp.route('/api/archive')
+@conditional_get('tasks')
+def api_get_archive():
+    try:
+        args = list_args(TASK_FIELDS, key_size=2)
+        query = ArchivedTask.query.options(*task_load_options(args.fields, ArchivedTask))
+        tasks, next_cursor = keyset_page(query, (ArchivedTask.task, ArchivedTask.id), args)
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    tasks_list = [project(task.to_dict(args.fields), args.fields) for task in tasks]
+    return with_cursor(jsonify(tasks_list), next_cursor)
+
+# API endpoint to delete a task (AJAX)
+@bp.route('/api/tasks/<int:id>', methods=['DELETE'])
+def api_delete_task(id):
+    task = get_task(db.session, id) or abort(404)
+    db.session.delete(task)
+    db.session.commit()
+    return jsonify({'success': True})
+
+
+# ============ SEARCH API ============
+
+@bp.route('/api/search', methods=['GET'])
+@conditional_get('tasks')
+def api_search():
+    query = request.args.get('q', '').strip()
+    
+    if not query:
+        return jsonify([])
+    
+    try:
+        args = list_args(TASK_FIELDS + ('snippet',), key_size=2)
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    wants_snippet = args.fields is None or 'snippet' in args.fields
+    
+    # Full-text search in task name, project, notes, and members (ranked)
+    # One extra result tells whether there is a next page
+    fetch = args.limit + 1 if args.limit else None
+    matches = search_tasks(query, limit=fetch, after=args.cursor, fields=args.fields, snippets=wants_snippet)
+    next_cursor = None
+    if args.limit and len(matches) > args.limit:
+        matches = matches[:args.limit]
+        next_cursor = encode_cursor(matches[-1][2])
+    
+    results = []
+    for task, snippet, _ in matches:
+        item = task.to_dict(args.fields)
+        item['snippet'] = snippet
+        results.append(project(item, args.fields))
+    
+    return with_cursor(jsonify(results), next_cursor)
@@ -0,0 +1,176 @@
+"""Team and team member API"""
+import os
+
+from flask import Blueprint, current_app, request, jsonify, abort
+from sqlalchemy import update
+
+from models import db, Team, TeamMember, ArchivedTask
+from changes import mark_changed
+from reference import reference_data
+from conditional import conditional_get
+from pagination import MEMBER_FIELDS, ListArgsError, list_args, list_page, project, with_cursor
+
+bp = Blueprint('teams', __name__)
+
+# ============ TEAM MANAGEMENT API ============
+
+# Get all teams with their members
+@bp.route('/api/teams', methods=['GET'])
+@conditional_get('teams', 'members')
+def api_get_teams():
+    return jsonify(reference_data().teams)
+
+# Create a new team
+@bp.route('/api/teams', methods=['POST'])
+def api_create_team():
+    data = request.json
+    name_en = data.get('name_en', '').strip().lower()
+    name_he = data.get('name_he', '').strip()
+    
+    if not name_en or not name_he:
+        return jsonify({'success': False, 'error': 'Both English and Hebrew names are required'}), 400
+    
+    # Check if team already exists
+    existing = Team.query.filter_by(name_en=name_en).first()
+    if existing:
+        return jsonify({'success': False, 'error': 'Team with this English name already exists'}), 400
+    
+    team = Team(name_en=name_en, name_he=name_he)
+    db.session.add(team)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'team': team.to_dict()})
+
+# Update a team
+@bp.route('/api/teams/<int:id>', methods=['PUT'])
+def api_update_team(id):
+    team = Team.query.get_or_404(id)
+    data = request.json
+    
+    if 'name_en' in data:
+        team.name_en = data['name_en'].strip().lower()
+    if 'name_he' in data:
+        team.name_he = data['name_he'].strip()
+    
+    db.session.commit()
+    
+    return jsonify({'success': True, 'team': team.to_dict()})
+
+# Delete a team
+@bp.route('/api/teams/<int:id>', methods=['DELETE'])
+def api_delete_team(id):
+    team = Team.query.get_or_404(id)
+    # Team.tasks nulls team_id on active tasks only; team ids are reused,
+    # so archived tasks must not keep pointing at this one either
+    archived = db.session.execute(
+        update(ArchivedTask).where(ArchivedTask.team_id == id).values(team_id=None)
+        .returning(ArchivedTask.id)
+    ).scalars().all()
+    if archived:
+        mark_changed(db.session, 'tasks', 'update', archived)
+    db.session.delete(team)
+    db.session.commit()
+    
+    return jsonify({'success': True})
+
+
+# ============ TEAM MEMBER API ============
+
+# Get members of a specific team
+@bp.route('/api/teams/<int:team_id>/members', methods=['GET'])
+@conditional_get('teams', 'members')
+def api_get_team_members(team_id):
+    members = reference_data().team_members(team_id)
+    if members is None:
+        abort(404)
+    return jsonify(members)
+
+# Get all members (across all teams)
+@bp.route('/api/members', methods=['GET'])
+@conditional_get('teams', 'members')
+def api_get_all_members():
+    try:
+        args = list_args(MEMBER_FIELDS)
+        members, next_cursor = list_page(reference_data().members, args)
+    except ListArgsError as e:
+        return jsonify({'error': str(e)}), 400
+    return with_cursor(jsonify([project(member, args.fields) for member in members]), next_cursor)
+
+# Add a member to a team
+@bp.route('/api/teams/<int:team_id>/members', methods=['POST'])
+def api_add_team_member(team_id):
+    team = Team.query.get_or_404(team_id)
+    data = request.json
+    
+    name_en = data.get('name_en', '').strip().lower()
+    name_he = data.get('name_he', '').strip()
+    avatar_path = data.get('avatar_path', 'default.png')
+    
+    if not name_en or not name_he:
+        return jsonify({'success': False, 'error': 'Both English and Hebrew names are required'}), 400
+    
+    member = TeamMember(
+        team_id=team_id,
+        name_en=name_en,
+        name_he=name_he,
+        avatar_path=avatar_path
+    )
+    db.session.add(member)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'member': member.to_dict()})
+
+# Update a team member
+@bp.route('/api/teams/<int:team_id>/members/<int:member_id>', methods=['PUT'])
+def api_update_team_member(team_id, member_id):
+    member = TeamMember.query.filter_by(id=member_id, team_id=team_id).first_or_404()
+    data = request.json
+    
+    if 'name_en' in data:
+        member.name_en = data['name_en'].strip().lower()
+    if 'name_he' in data:
+        member.name_he = data['name_he'].strip()
+    if 'avatar_path' in data:
+        member.avatar_path = data['avatar_path']
+    
+    db.session.commit()
+    
+    return jsonify({'success': True, 'member': member.to_dict()})
+
+# Delete a team member
+@bp.route('/api/teams/<int:team_id>/members/<int:member_id>', methods=['DELETE'])
+def api_delete_team_member(team_id, member_id):
+    member = TeamMember.query.filter_by(id=member_id, team_id=team_id).first_or_404()
+    db.session.delete(member)
+    db.session.commit()
+    
+    return jsonify({'success': True})
+
+# Upload avatar for a team member
+@bp.route('/api/teams/<int:team_id>/members/<int:member_id>/avatar', methods=['POST'])
+def api_upload_avatar(team_id, member_id):
+    member = TeamMember.query.filter_by(id=member_id, team_id=team_id).first_or_404()
+    
+    if 'avatar' not in request.files:
+        return jsonify({'success': False, 'error': 'No file provided'}), 400
+    
+    file = request.files['avatar']
+    if file.filename == '':
+        return jsonify({'success': False, 'error': 'No file selected'}), 400
+    
+    # Validate file extension
+    allowed_extensions = {'png', 'jpg', 'jpeg', 'gif'}
+    if '.' not in file.filename or file.filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
+        return jsonify({'success': False, 'error': 'Invalid file type. Allowed: png, jpg, jpeg, gif'}), 400
+    
+    # Save file with member's name
+    filename = f"{member.name_en}.{file.filename.rsplit('.', 1)[1].lower()}"
+    os.makedirs(current_app.config['UPLOAD_FOLDER'], exist_ok=True)
+    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+    file.save(filepath)
+    
+    # Update member's avatar path
+    member.avatar_path = filename
+    db.session.commit()
+    
+    return jsonify({'success': True, 'avatar_path': filename})
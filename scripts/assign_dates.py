@@ -6,10 +6,11 @@ from datetime import datetime, timedelta
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app, db
-from models import Task
+from app import create_app
+from models import db, Task
 
 def assign_dates():
+    app = create_app()
     with app.app_context():
         tasks = Task.query.all()
         if not tasks:
@@ -0,0 +1,165 @@
+"""Read throughput while a writer is active: tuned connections vs SQLite defaults.
+
+Builds a scratch database per configuration, then runs reader threads
+(calendar range and list queries, as the UI polls them) against one writer
+thread committing small task updates, and reports read throughput and
+latency, write throughput and "database is locked" errors.
+
+    python scripts/benchmark_db.py --tasks 20000 --readers 8 --duration 10
+"""
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, select, update, insert, func
+from sqlalchemy.exc import OperationalError
+
+from models import db, Task
+from calendar_range import overlapping
+from database import engine_options, sqlite_pragmas, register_pragmas
+from search import init_search_index
+
+STATUSES = ['status-notstarted', 'status-inprogress', 'status-done', 'status-delayed']
+
+CONFIGURATIONS = {
+    # What the app runs with (database.py defaults)
+    'tuned': lambda config: sqlite_pragmas(config),
+    # Stock SQLite: rollback journal, full sync, default caches
+    'default': lambda config: {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+}
+
+
+def build_database(path, tasks, pragmas, config):
+    engine = create_engine(f'sqlite:///{path}', **engine_options(config))
+    register_pragmas(engine, pragmas)
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        init_search_index(conn)
+        today = date.today()
+        rows = []
+        for i in range(tasks):
+            start = today + timedelta(days=random.randint(-180, 180))
+            rows.append({
+                'project': f'project-{i % 50}',
+                'task': f'task {i}',
+                'members': 'alice,bob' if i % 2 else 'carol',
+                'status': random.choice(STATUSES),
+                'priority': 'none',
+                'notes': 'benchmark row ' * 5,
+                'team_id': i % 5 + 1,
+                'start_date': start,
+                'end_date': start + timedelta(days=random.randint(0, 14)),
+            })
+        conn.execute(insert(Task), rows)
+    return engine
+
+
+def reader(engine, stop, latencies, errors):
+    today = date.today()
+    while not stop.is_set():
+        start = today + timedelta(days=random.randint(-90, 90))
+        began = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                if random.random() < 0.5:
+                    conn.execute(
+                        select(Task.id, Task.task, Task.members, Task.start_date, Task.end_date)
+                        .where(Task.team_id == random.randint(1, 5))
+                        .where(overlapping(start, start + timedelta(days=6)))
+                    ).all()
+                else:
+                    conn.execute(
+                        select(Task).where(Task.team_id == random.randint(1, 5))
+                        .order_by(Task.id.desc()).limit(50)
+                    ).all()
+        except OperationalError:
+            errors.append(1)
+            continue
+        latencies.append(time.perf_counter() - began)
+
+
+def writer(engine, stop, tasks, commits, errors):
+    while not stop.is_set():
+        try:
+            with engine.begin() as conn:
+                for _ in range(5):
+                    conn.execute(
+                        update(Task).where(Task.id == random.randint(1, tasks))
+                        .values(status=random.choice(STATUSES), notes=f'edited {time.time()}')
+                    )
+            commits.append(1)
+        except OperationalError:
+            errors.append(1)
+
+
+def run(name, args):
+    config = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///bench.db', 'DB_POOL_SIZE': args.readers + 1}
+    pragmas = CONFIGURATIONS[name](config)
+    workdir = tempfile.mkdtemp(prefix='teamtasks-bench-')
+    try:
+        engine = build_database(os.path.join(workdir, 'bench.db'), args.tasks, pragmas, config)
+        stop = threading.Event()
+        latencies, read_errors, commits, write_errors = [], [], [], []
+        threads = [threading.Thread(target=reader, args=(engine, stop, latencies, read_errors))
+                   for _ in range(args.readers)]
+        if not args.no_writer:
+            threads.append(threading.Thread(target=writer, args=(engine, stop, args.tasks, commits, write_errors)))
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        with engine.connect() as conn:
+            mode = conn.exec_driver_sql('PRAGMA journal_mode').scalar()
+            assert conn.execute(select(func.count(Task.id))).scalar() == args.tasks
+        engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000 if latencies else 0
+    return {
+        'config': f'{name} ({mode})',
+        'reads/s': len(latencies) / args.duration,
+        'p50 ms': statistics.median(latencies) * 1000 if latencies else 0,
+        'p99 ms': percentile(0.99),
+        'max ms': latencies[-1] * 1000 if latencies else 0,
+        'commits/s': len(commits) / args.duration,
+        'locked': len(read_errors) + len(write_errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=20000, help='rows in the scratch database')
+    parser.add_argument('--readers', type=int, default=8, help='concurrent reader threads')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per configuration')
+    parser.add_argument('--no-writer', action='store_true', help='measure readers alone')
+    parser.add_argument('--only', choices=sorted(CONFIGURATIONS), help='run a single configuration')
+    args = parser.parse_args()
+
+    names = [args.only] if args.only else list(CONFIGURATIONS)
+    results = [run(name, args) for name in names]
+
+    columns = list(results[0])
+    widths = {c: max(len(c), *(len(f'{r[c]:.1f}' if isinstance(r[c], float) else str(r[c])) for r in results))
+              for c in columns}
+    print('  '.join(c.ljust(widths[c]) for c in columns))
+    for result in results:
+        cells = [f'{result[c]:.1f}' if isinstance(result[c], float) else str(result[c]) for c in columns]
+        print('  '.join(cell.ljust(widths[c]) for cell, c in zip(cells, columns)))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,13 +2,15 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app, db
-from models import Task
+from app import create_app
+from models import db, Task, ArchivedTask, TaskMember
 
 def clear_data():
+    app = create_app()
     with app.app_context():
         print("Clearing all tasks...")
-        num_deleted = db.session.query(Task).delete()
+        db.session.query(TaskMember).delete()
+        num_deleted = db.session.query(Task).delete() + db.session.query(ArchivedTask).delete()
         db.session.commit()
         print(f"Deleted {num_deleted} tasks.")
 
@@ -3,11 +3,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app, db
-from models import Team, TeamMember
+from app import create_app
+from models import db, Team, TeamMember
+from migrations import upgrade_database
 
 def init_teams():
+    app = create_app()
     with app.app_context():
+        upgrade_database()
         # Clear existing data? Maybe not, just check if exists.
         
         teams_data = [
@@ -3,10 +3,11 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app, db
-from models import Team, TeamMember, Task
+from app import create_app
+from models import db, Team, TeamMember, Task
 
 def seed_data():
+    app = create_app()
     with app.app_context():
         teams = Team.query.all()
         members = TeamMember.query.all()
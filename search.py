@@ -0,0 +1,188 @@
+"""Full-text search over tasks (SQLite FTS5).
+
+`task_fts` is a standalone FTS5 table keyed by task id and kept in sync
+with `task` and `archived_task` by triggers, so every write path (ORM,
+bulk SQL, restores, archive moves) is covered. Databases without FTS5 fall
+back to LIKE matching.
+"""
+import re
+from html import escape
+
+from sqlalchemy import text, or_, column
+
+from models import db, Task, ArchivedTask
+from pagination import task_load_options
+
+FTS_TABLE = 'task_fts'
+
+def _fts_triggers(table, other):
+    """Keep task_fts in sync with one task table.
+
+    Ids are shared with the other task table: an insert replaces the entry
+    (it may be a row moving in), and a delete keeps it while the row still
+    exists over there (it moved out).
+    """
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN
+        DELETE FROM task_fts WHERE rowid = new.id;
+        INSERT INTO task_fts(rowid, task, project, notes, members)
+        VALUES (new.id, new.task, new.project, coalesce(new.notes, ''), replace(new.members, ',', ' '));
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF task, project, notes, members ON {table} BEGIN
+        DELETE FROM task_fts WHERE rowid = old.id;
+        INSERT INTO task_fts(rowid, task, project, notes, members)
+        VALUES (new.id, new.task, new.project, coalesce(new.notes, ''), replace(new.members, ',', ' '));
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table}
+        WHEN NOT EXISTS (SELECT 1 FROM {other} WHERE id = old.id) BEGIN
+        DELETE FROM task_fts WHERE rowid = old.id;
+    END""",
+    ]
+
+
+# unicode61 splits Hebrew (and Latin) text on word boundaries and folds case;
+# remove_diacritics folds accented Latin letters. Queries are prefix queries,
+# so "שרת" also finds "שרתים"; the prefix indexes keep short "word*"
+# queries (typing as you search) cheap.
+FTS_SCHEMA = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5(
+        task, project, notes, members,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )""",
+] + _fts_triggers('task', 'archived_task') + _fts_triggers('archived_task', 'task')
+
+FTS_TRIGGERS = tuple(f'{table}_fts_{op}' for table in ('task', 'archived_task') for op in ('insert', 'update', 'delete'))
+
+FTS_REBUILD = """INSERT INTO task_fts(rowid, task, project, notes, members)
+    SELECT id, task, project, coalesce(notes, ''), replace(members, ',', ' ') FROM task
+    UNION ALL
+    SELECT id, task, project, coalesce(notes, ''), replace(members, ',', ' ') FROM archived_task"""
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+RANK_WEIGHTS = (10.0, 5.0, 1.0, 2.0)  # task, project, notes, members
+SNIPPET_TOKENS = 12
+# Control characters mark highlights inside snippet() output; the text is
+# HTML-escaped before they are turned into <mark> tags.
+MARK_OPEN, MARK_CLOSE = '\x02', '\x03'
+
+_fts_enabled = {}
+
+
+def init_search_index(conn):
+    """Create the FTS table and triggers, indexing existing tasks on first run"""
+    if conn.dialect.name != 'sqlite':
+        return False
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+    ).first()
+    try:
+        for statement in FTS_SCHEMA:
+            conn.execute(text(statement))
+    except Exception:
+        # SQLite built without FTS5
+        _fts_enabled[conn.engine.url] = False
+        return False
+    if not exists:
+        conn.execute(text(FTS_REBUILD))
+    _fts_enabled[conn.engine.url] = True
+    return True
+
+
+def drop_search_index(conn):
+    if conn.dialect.name == 'sqlite':
+        conn.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+    _fts_enabled.pop(conn.engine.url, None)
+
+
+def fts_available():
+    engine = db.engine
+    if engine.url not in _fts_enabled:
+        if engine.dialect.name != 'sqlite':
+            _fts_enabled[engine.url] = False
+        else:
+            with engine.connect() as conn:
+                _fts_enabled[engine.url] = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {'name': FTS_TABLE}
+                ).first() is not None
+    return _fts_enabled[engine.url]
+
+
+def build_match_query(query_str):
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    tokens = TOKEN_RE.findall(query_str)
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def task_search_filter(query_str, model=Task):
+    """SQL criterion selecting tasks (of model's table) that match query_str"""
+    if fts_available():
+        match = build_match_query(query_str)
+        if not match:
+            return model.id.is_(None)
+        matching_ids = text(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query') \
+            .bindparams(fts_query=match).columns(column('rowid'))
+        return model.id.in_(matching_ids)
+
+    search_pattern = f'%{query_str}%'
+    return or_(
+        model.task.like(search_pattern),
+        model.project.like(search_pattern),
+        model.notes.like(search_pattern),
+        model.members.like(search_pattern)
+    )
+
+
+def _highlight(snippet):
+    return escape(snippet).replace(MARK_OPEN, '<mark>').replace(MARK_CLOSE, '</mark>')
+
+
+def search_tasks(query_str, limit=None, after=None, fields=None, snippets=True):
+    """Return [(task, snippet_html, sort_key)] ordered by relevance (best first).
+
+    Active and archived tasks are both searched. sort_key ([rank, id])
+    passed back as `after` resumes right after that result; only `fields`
+    of the tasks are loaded (see task_load_options).
+    """
+    if not fts_available():
+        tasks = []
+        for model in (Task, ArchivedTask):
+            query = model.query.options(*task_load_options(fields, model)).filter(task_search_filter(query_str, model))
+            if after is not None:
+                query = query.filter(model.id > after[1])
+            tasks.extend(query.order_by(model.id).limit(limit).all())
+        tasks = sorted(tasks, key=lambda task: task.id)[:limit]
+        return [(task, None, [0, task.id]) for task in tasks]
+
+    match = build_match_query(query_str)
+    if not match:
+        return []
+
+    rank = f"bm25({FTS_TABLE}, {', '.join(str(w) for w in RANK_WEIGHTS)})"
+    snippet = f"snippet({FTS_TABLE}, -1, :mark_open, :mark_close, '…', :tokens)" if snippets else 'NULL'
+    params = {'fts_query': match, 'mark_open': MARK_OPEN, 'mark_close': MARK_CLOSE,
+              'tokens': SNIPPET_TOKENS, 'limit': -1 if limit is None else limit}
+    resume = ''
+    if after is not None:
+        resume = f"AND ({rank}, rowid) > (:after_rank, :after_id) "
+        params.update(after_rank=after[0], after_id=after[1])
+    rows = db.session.execute(
+        text(
+            f"SELECT rowid, {snippet}, {rank} AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query {resume}"
+            f"ORDER BY rank, rowid LIMIT :limit"
+        ),
+        params
+    ).all()
+    if not rows:
+        return []
+
+    tasks = {}
+    missing = [row[0] for row in rows]
+    for model in (Task, ArchivedTask):
+        if missing:
+            tasks.update((task.id, task) for task in
+                         model.query.options(*task_load_options(fields, model)).filter(model.id.in_(missing)))
+            missing = [task_id for task_id in missing if task_id not in tasks]
+    return [(tasks[task_id], _highlight(snippet) if snippets else None, [score, task_id])
+            for task_id, snippet, score in rows if task_id in tasks]
@@ -1,13 +1,14 @@
-from app import app, db, Team, TeamMember, Task, SpecialDay
+from app import create_app
+from models import db, Team, TeamMember, Task, SpecialDay
+from migrations import reset_database
 from datetime import date, timedelta
 import random
 
 def seed():
+    app = create_app()
     with app.app_context():
-        print("Dropping all tables...")
-        db.drop_all()
-        print("Creating all tables...")
-        db.create_all()
+        print("Dropping and recreating all tables...")
+        reset_database()
 
         # Teams in Hebrew (name_en must be lowercase for filter logic)
         teams_data = [
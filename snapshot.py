@@ -0,0 +1,164 @@
+"""Native SQLite snapshots (online backup API).
+
+A snapshot is a page-level copy of the whole database file: schema,
+indexes, the search index and every row exactly as stored, with no ORM
+involved. It is taken in one backup step from a read transaction, so it is
+consistent; in WAL mode writers carry on while it is copied.
+
+Restoring runs the backup API the other way round, from a validated upload
+into the live database. SQLite applies that as a single write transaction,
+so every connection (in every worker process) sees either the old or the
+new database, never a mix, and no file is swapped underneath open handles.
+"""
+import gzip
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+
+from sqlalchemy import update
+
+from models import db, DataVersion
+from changes import TRACKED_TABLES, mark_changed, read_versions
+from migrations import upgrade_database
+
+SQLITE_MAGIC = b'SQLite format 3\x00'
+# Tables a snapshot must contain to be restorable
+REQUIRED_TABLES = ('team', 'team_member', 'task', 'special_day')
+COPY_CHUNK = 1024 * 1024
+
+
+class SnapshotError(ValueError):
+    """The uploaded snapshot cannot be restored"""
+
+
+def snapshots_supported():
+    return db.engine.dialect.name == 'sqlite' and bool(db.engine.url.database) \
+        and db.engine.url.database != ':memory:'
+
+
+def _database_dir():
+    return os.path.dirname(os.path.abspath(db.engine.url.database))
+
+
+def _temp_path():
+    # Next to the database: same volume, and usually more room than /tmp
+    fd, path = tempfile.mkstemp(dir=_database_dir(), prefix='.snapshot-', suffix='.db')
+    os.close(fd)
+    return path
+
+
+def remove_snapshot(path):
+    """Delete a temporary snapshot file (and any journal next to it)"""
+    for suffix in ('', '-journal', '-wal', '-shm'):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def take_snapshot():
+    """Copy the live database into a temporary file; returns its path"""
+    path = _temp_path()
+    try:
+        with db.engine.connect() as conn:
+            source = conn.connection.driver_connection
+            target = sqlite3.connect(path)
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+    except Exception:
+        remove_snapshot(path)
+        raise
+    return path
+
+
+def snapshot_stream(path, compress=True):
+    """Generator of the snapshot file's bytes; deletes the file when done"""
+    try:
+        with open(path, 'rb') as snapshot:
+            if not compress:
+                while chunk := snapshot.read(COPY_CHUNK):
+                    yield chunk
+                return
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+            while chunk := snapshot.read(COPY_CHUNK):
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+    finally:
+        remove_snapshot(path)
+
+
+def snapshot_filename(compress=True):
+    return f'backup_snapshot_{int(time.time())}.db' + ('.gz' if compress else '')
+
+
+def save_upload(stream):
+    """Write an uploaded snapshot (gzipped or not) to a temporary file"""
+    magic = stream.read(2)
+    stream.seek(0)
+    if magic == b'\x1f\x8b':
+        stream = gzip.GzipFile(fileobj=stream, mode='rb')
+    path = _temp_path()
+    try:
+        with open(path, 'wb') as target:
+            while chunk := stream.read(COPY_CHUNK):
+                target.write(chunk)
+    except (OSError, EOFError):
+        remove_snapshot(path)
+        raise SnapshotError('Invalid snapshot file: corrupt gzip data')
+    return path
+
+
+def validate_snapshot(path):
+    """Check the file is an intact TeamTasks SQLite database"""
+    with open(path, 'rb') as snapshot:
+        if snapshot.read(len(SQLITE_MAGIC)) != SQLITE_MAGIC:
+            raise SnapshotError('Invalid snapshot file: not an SQLite database')
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        result = conn.execute('PRAGMA quick_check').fetchone()[0]
+        if result != 'ok':
+            raise SnapshotError(f'Snapshot is corrupt: {result}')
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    except sqlite3.DatabaseError as e:
+        raise SnapshotError(f'Invalid snapshot file: {e}')
+    finally:
+        conn.close()
+    missing = [table for table in REQUIRED_TABLES if table not in tables]
+    if missing:
+        raise SnapshotError(f'Snapshot is missing tables: {", ".join(missing)}')
+
+
+def restore_snapshot(path):
+    """Replace the live database with the snapshot at path (atomically).
+
+    Afterwards the schema is upgraded (older snapshots) and every data
+    version moves past its pre-restore value, so clients reload.
+    """
+    db.session.remove()
+    before = read_versions(db.session)
+    db.session.remove()
+
+    source = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        with db.engine.connect() as conn:
+            source.backup(conn.connection.driver_connection)
+    finally:
+        source.close()
+
+    upgrade_database()
+
+    restored = read_versions(db.session)
+    for table in TRACKED_TABLES:
+        db.session.execute(
+            update(DataVersion)
+            .where(DataVersion.table_name == table)
+            .values(version=max(before[table], restored[table]))
+        )
+        mark_changed(db.session, table)
+    db.session.commit()
@@ -67,46 +67,125 @@ document.addEventListener('DOMContentLoaded', () => {
                 return;
             }
 
-            let successCount = 0;
-            let errorCount = 0;
-
-            // Process files sequentially
+            // All files go in one request: a full backup plus differential
+            // backups are applied in order, all or nothing
+            const formData = new FormData();
             for (let i = 0; i < files.length; i++) {
-                const formData = new FormData();
                 formData.append('file', files[i]);
+            }
+
+            try {
+                const response = await fetch(`/api/restore/${table}`, {
+                    method: 'POST',
+                    body: formData
+                });
+                const result = await response.json();
+
+                if (result.success) {
+                    showToast(`השחזור הושלם: ${files.length} קבצים עובדו בהצלחה`, 'success');
+                    // Refresh teams if that was the target
+                    if (table === 'all' || table === 'teams' || table === 'members') {
+                        loadTeams();
+                    }
+                } else {
+                    console.error('Error restoring backup:', result.error);
+                    showToast(`שגיאה בשחזור: ${result.error}`, 'error');
+                }
+            } catch (error) {
+                console.error(error);
+                showToast('שגיאה בשחזור', 'error');
+            }
 
-                try {
-                    const response = await fetch(`/api/restore/${table}`, {
-                        method: 'POST',
-                        body: formData
-                    });
-                    const result = await response.json();
+            // Clear input
+            fileInput.value = '';
+        });
+    }
 
-                    if (result.success) {
-                        successCount++;
+    // Bulk Archive
+    const bulkArchiveBtn = document.getElementById('bulkArchiveBtn');
+    if (bulkArchiveBtn) {
+        bulkArchiveBtn.addEventListener('click', async () => {
+            const request = {
+                filter: {
+                    project: document.getElementById('bulkArchiveProject').value.trim(),
+                    team_id: document.getElementById('bulkArchiveTeam').value,
+                    status: document.getElementById('bulkArchiveStatus').value,
+                    older_than_days: document.getElementById('bulkArchiveDays').value
+                },
+                archive: document.getElementById('bulkArchiveAction').value === 'archive'
+            };
+            const progress = document.getElementById('bulkArchiveProgress');
+
+            try {
+                // Count first, so the confirmation shows what will happen
+                let result = await postBulkArchive({ ...request, dry_run: true });
+                if (!result.success) {
+                    showToast(`שגיאה: ${result.error}`, 'error');
+                    return;
+                }
+                if (result.count === 0) {
+                    showToast('לא נמצאו משימות מתאימות', 'error');
+                    return;
+                }
+                const action = request.archive ? 'להעביר לארכיון' : 'להחזיר מהארכיון';
+                if (!confirm(`האם אתה בטוח שברצונך ${action} ${result.count} משימות?`)) return;
+
+                bulkArchiveBtn.disabled = true;
+                result = await postBulkArchive(request);
+                if (!result.success) {
+                    showToast(`שגיאה: ${result.error}`, 'error');
+                } else if (result.job) {
+                    // Large sets run in the background: poll for progress
+                    const job = await waitForJob(result.job, progress);
+                    if (job.status === 'done') {
+                        showToast(`הפעולה הושלמה: ${job.done} משימות`, 'success');
+                    } else if (job.status === 'running') {
+                        showToast('הפעולה עדיין רצה ברקע, בדוק שוב מאוחר יותר', 'error');
                     } else {
-                        console.error(`Error restoring file ${files[i].name}:`, result.error);
-                        errorCount++;
-                        showToast(`שגיאה בקובץ ${files[i].name}: ${result.error}`, 'error');
+                        showToast(`שגיאה: ${job.error}`, 'error');
                     }
-                } catch (error) {
-                    console.error(error);
-                    errorCount++;
-                    showToast(`שגיאה בקובץ ${files[i].name}`, 'error');
+                } else {
+                    showToast(`הפעולה הושלמה: ${result.count} משימות`, 'success');
                 }
+            } catch (error) {
+                console.error(error);
+                showToast('שגיאה בארכוב', 'error');
             }
+            progress.textContent = '';
+            bulkArchiveBtn.disabled = false;
+        });
+    }
 
-            if (successCount > 0) {
-                showToast(`השחזור הושלם: ${successCount} קבצים עובדו בהצלחה`, 'success');
-                // Refresh teams if that was the target
-                if (table === 'teams' || table === 'members') {
-                    loadTeams();
-                }
+    // A running job refreshes updated_at with every chunk, and the server
+    // takes over one whose worker died, so a heartbeat that stands still
+    // this long means nothing is coming: stop polling (the job may still finish)
+    const JOB_POLL_MS = 1000;
+    const JOB_STALL_MS = 5 * 60 * 1000;
+
+    async function waitForJob(job, progress) {
+        let heartbeat = job.updated_at;
+        let lastBeat = Date.now();
+        while (job.status === 'running' && Date.now() - lastBeat < JOB_STALL_MS) {
+            progress.textContent = `מעבד... ${job.done} / ${job.total}`;
+            await new Promise(resolve => setTimeout(resolve, JOB_POLL_MS));
+            const response = await fetch(`/api/jobs/${job.id}`);
+            if (!response.ok) continue;
+            job = await response.json();
+            if (job.updated_at !== heartbeat) {
+                heartbeat = job.updated_at;
+                lastBeat = Date.now();
             }
+        }
+        return job;
+    }
 
-            // Clear input
-            fileInput.value = '';
+    async function postBulkArchive(body) {
+        const response = await fetch('/api/tasks/bulk-archive', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(body)
         });
+        return response.json();
     }
 
     // Event Listeners
@@ -148,12 +227,22 @@ document.addEventListener('DOMContentLoaded', () => {
             const response = await fetch('/api/teams');
             teams = await response.json();
             renderTeams();
+            renderBulkArchiveTeams();
         } catch (error) {
             showToast('שגיאה בטעינת צוותים', 'error');
             console.error(error);
         }
     }
 
+    function renderBulkArchiveTeams() {
+        const select = document.getElementById('bulkArchiveTeam');
+        if (!select) return;
+        const selected = select.value;
+        select.innerHTML = '<option value="">כל הצוותים</option>' +
+            teams.map(team => `<option value="${team.id}">${team.name_he}</option>`).join('');
+        select.value = selected;
+    }
+
     function renderTeams() {
         if (teams.length === 0) {
             teamsContainer.innerHTML = `
@@ -1,9 +1,40 @@
 // API Interactions
 
+// Conditional GET cache: url -> { etag, data }. Read APIs answer 304 while
+// the data behind a URL is unchanged, so revisiting a week or reloading the
+// teams costs one empty round trip instead of a full payload.
+const RESPONSE_CACHE_SIZE = 50;
+const responseCache = new Map();
+
+export async function getJSON(url) {
+    const cached = responseCache.get(url);
+    // no-store: keep the browser cache out of it so the 304 reaches us
+    const response = await fetch(url, {
+        cache: 'no-store',
+        headers: cached ? { 'If-None-Match': cached.etag } : {}
+    });
+
+    if (response.status === 304 && cached) {
+        responseCache.delete(url); // most recently used goes last
+        responseCache.set(url, cached);
+        return structuredClone(cached.data);
+    }
+
+    const data = await response.json();
+    const etag = response.headers.get('ETag');
+    if (response.ok && etag) {
+        responseCache.delete(url);
+        responseCache.set(url, { etag, data: structuredClone(data) });
+        if (responseCache.size > RESPONSE_CACHE_SIZE) {
+            responseCache.delete(responseCache.keys().next().value);
+        }
+    }
+    return data;
+}
+
 export async function fetchTeams() {
     try {
-        const response = await fetch('/api/teams');
-        return await response.json();
+        return await getJSON('/api/teams');
     } catch (error) {
         console.error('Error loading teams:', error);
         return [];
@@ -12,8 +43,7 @@ export async function fetchTeams() {
 
 export async function fetchMembers() {
     try {
-        const response = await fetch('/api/members');
-        return await response.json();
+        return await getJSON('/api/members');
     } catch (error) {
         console.error('Error loading members:', error);
         return [];
@@ -30,6 +60,26 @@ export async function fetchVersion() {
     }
 }
 
+export async function pollChanges(version) {
+    // Long-poll fallback: resolves when the server has a change notice or times out
+    const response = await fetch(`/api/stream/poll?version=${version}`);
+    // 503: the server has no thread to spare for another open poll
+    if (response.status === 503) return { busy: true };
+    if (!response.ok) throw new Error(`Poll failed: ${response.status}`);
+    return await response.json();
+}
+
+export async function fetchChanges(cursor) {
+    try {
+        const query = (cursor === null || cursor === undefined) ? '' : `?since=${cursor}`;
+        const response = await fetch(`/api/changes${query}`);
+        return await response.json();
+    } catch (error) {
+        console.error('Error loading changes:', error);
+        return null;
+    }
+}
+
 export async function updateTask(taskId, payload) {
     try {
         const response = await fetch(`/api/tasks/${taskId}`, {
@@ -72,14 +122,23 @@ export async function deleteTask(taskId) {
 
 export async function searchTasks(query) {
     try {
-        const response = await fetch(`/api/search?q=${encodeURIComponent(query)}`);
-        return await response.json();
+        // Only ids are needed to filter the rendered board
+        return await getJSON(`/api/search?q=${encodeURIComponent(query)}&fields=id`);
     } catch (error) {
         console.error('Search error:', error);
         throw error;
     }
 }
 
+export async function fetchProjectCards(keys) {
+    // Dashboard cards for the current filters; HTML only for keys we do not have
+    const params = new URLSearchParams(window.location.search);
+    params.set('have', keys.join(','));
+    const response = await fetch(`/partials/project-cards?${params}`);
+    if (!response.ok) throw new Error(`Loading project cards failed: ${response.status}`);
+    return await response.json();
+}
+
 export async function fetchPageContent(url) {
     try {
         const response = await fetch(url);
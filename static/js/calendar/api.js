@@ -1,5 +1,6 @@
 // Calendar API
 
+import { getJSON } from '../api.js';
 import { getWeekStart, formatDateToISO } from './utils.js'; // We'll create utils next
 // Or import generic utils if possible. Let's make a local utils for calendar specific stuff or use shared.
 // We need to fetch data.
@@ -10,14 +11,13 @@ export async function fetchWeekData(date, teamId) {
         const weekEnd = new Date(weekStart);
         weekEnd.setDate(weekEnd.getDate() + 6); // 7 days inclusive
 
-        let url = `/api/calendar/week?start_date=${formatDateToISO(weekStart)}&end_date=${formatDateToISO(weekEnd)}`;
+        let url = `/api/calendar/range?start=${formatDateToISO(weekStart)}&end=${formatDateToISO(weekEnd)}`;
 
         if (teamId) {
             url += `&team_id=${teamId}`;
         }
 
-        const response = await fetch(url);
-        return await response.json();
+        return await getJSON(url);
     } catch (error) {
         console.error('Error loading week data:', error);
         return { tasks: [] };
@@ -36,18 +36,35 @@ export async function fetchWorkloadData(date, teamId) {
             url += `&team_id=${teamId}`;
         }
 
-        const response = await fetch(url);
-        return await response.json();
+        return await getJSON(url);
     } catch (error) {
         console.error('Error loading workload data:', error);
         return { workload: [] };
     }
 }
 
+export async function fetchWorkloadHours(date, teamId) {
+    try {
+        const weekStart = getWeekStart(date);
+        const weekEnd = new Date(weekStart);
+        weekEnd.setDate(weekEnd.getDate() + 4); // 5 days (Sun-Thu)
+
+        let url = `/api/calendar/workload/hours?start_date=${formatDateToISO(weekStart)}&end_date=${formatDateToISO(weekEnd)}`;
+
+        if (teamId) {
+            url += `&team_id=${teamId}`;
+        }
+
+        return await getJSON(url);
+    } catch (error) {
+        console.error('Error loading workload hours:', error);
+        return { days: [], members: [], hours: [], task_counts: [] };
+    }
+}
+
 export async function fetchSpecialDays() {
     try {
-        const response = await fetch('/api/special-days');
-        return await response.json();
+        return await getJSON('/api/special-days');
     } catch (error) {
         console.error('Error loading special days:', error);
         return [];
@@ -133,8 +150,7 @@ export async function deleteTask(id) {
 
 export async function fetchTeams() {
     try {
-        const response = await fetch('/api/teams?mode=active');
-        return await response.json();
+        return await getJSON('/api/teams?mode=active');
     } catch (error) {
         console.error('Error loading teams:', error);
         return [];
@@ -143,8 +159,7 @@ export async function fetchTeams() {
 
 export async function fetchMembers() {
     try {
-        const response = await fetch('/api/members');
-        return await response.json();
+        return await getJSON('/api/members');
     } catch (error) {
         console.error('Error loading members:', error);
         return [];
@@ -3,6 +3,9 @@
 export const hebrewDays = ['ראשון', 'שני', 'שלישי', 'רביעי', 'חמישי', 'שישי', 'שבת'];
 export const hebrewMonths = ['ינואר', 'פברואר', 'מרץ', 'אפריל', 'מאי', 'יוני', 'יולי', 'אוגוסט', 'ספטמבר', 'אוקטובר', 'נובמבר', 'דצמבר'];
 
+// Allocated hours per day above which a member is shown as overloaded
+export const DAILY_CAPACITY_HOURS = 8;
+
 export const priorityColors = {
     'high': '#ef4444',
     'medium': '#f59e0b',
@@ -2,7 +2,7 @@
 import * as API from './api.js';
 import * as UI from './ui.js';
 import * as Events from './events.js';
-import { state, setCurrentView, setActiveTeamFilter, setSpecialDays, setTasks, setTeams, setMembers } from './state.js';
+import { state, setCurrentView, setActiveTeamFilter, setSpecialDays, setTasks, setTeams, setMembers, setWorkloadHours } from './state.js';
 
 async function init() {
     UI.updateDOMElements();
@@ -65,8 +65,13 @@ export async function renderCurrentView() {
         setTasks(data.tasks || []);
         UI.renderWeekView();
     } else if (state.currentView === 'workload') {
-        const data = await API.fetchWorkloadData(state.currentDate, state.activeTeamFilter);
+        // Task blocks per member, and the hours each member has allocated per day
+        const [data, hours] = await Promise.all([
+            API.fetchWorkloadData(state.currentDate, state.activeTeamFilter),
+            API.fetchWorkloadHours(state.currentDate, state.activeTeamFilter)
+        ]);
         setTasks(data.workload || []); // reusing tasks state for member-workload array?
+        setWorkloadHours(hours);
         // Note: UI.renderWorkloadView expects state.tasks to be the array of member data.
         UI.renderWorkloadView();
     }
@@ -7,6 +7,7 @@ export const state = {
     statusFilter: 'all',
     priorityFilter: 'all',
     tasks: [],
+    workloadHours: null, // /api/calendar/workload/hours of the workload view
     specialDays: [],
     currentTaskId: null,
     teams: [],
@@ -45,6 +46,10 @@ export function setTasks(tasks) {
     state.tasks = tasks;
 }
 
+export function setWorkloadHours(hours) {
+    state.workloadHours = hours;
+}
+
 export function setSpecialDays(days) {
     state.specialDays = days;
 }
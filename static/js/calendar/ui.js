@@ -1,6 +1,6 @@
 // Calendar UI
 import { state, setCurrentTaskId } from './state.js';
-import { hebrewDays, hebrewMonths, priorityColors } from './constants.js';
+import { hebrewDays, hebrewMonths, priorityColors, DAILY_CAPACITY_HOURS } from './constants.js';
 import { getWeekStart, formatDateToISO, formatDateDisplay, parseDateFromISO } from './utils.js';
 import * as Events from './events.js'; // Circular dependency risk? Events uses UI, UI might need Events for attaching listener logic?
 // Better to pass callbacks or function references.
@@ -219,6 +219,14 @@ export function renderWorkloadView() {
     headerRow.appendChild(headerTimeline);
     container.appendChild(headerRow);
 
+    // Allocated hours come from the server, as member x day arrays
+    const workload = state.workloadHours || {};
+    const hoursRows = {};
+    (workload.members || []).forEach((member, i) => {
+        hoursRows[member.name_en] = i;
+    });
+    const hoursDays = workload.days || [];
+
     // Member Rows
     state.tasks.forEach(memberData => {
         const memberRow = document.createElement('div');
@@ -248,6 +256,18 @@ export function renderWorkloadView() {
             const specialDay = state.specialDays.find(sd => sd.date === dayStr);
             if (specialDay) dayCell.classList.add('special-day');
 
+            const row = hoursRows[memberData.member.name_en];
+            const dayIndex = hoursDays.indexOf(dayStr);
+            const hours = row !== undefined && dayIndex >= 0 ? workload.hours[row][dayIndex] : 0;
+            if (hours > 0) {
+                const hoursLabel = document.createElement('div');
+                hoursLabel.className = 'workload-hours';
+                if (hours > DAILY_CAPACITY_HOURS) hoursLabel.classList.add('overloaded');
+                hoursLabel.textContent = `${hours} ש'`;
+                hoursLabel.title = `${workload.task_counts[row][dayIndex]} משימות`;
+                dayCell.appendChild(hoursLabel);
+            }
+
             const tasksForDay = memberData.tasks.filter(task => {
                 if (!task.start_date) return false;
 
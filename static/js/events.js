@@ -53,25 +53,9 @@ export function attachGlobalListeners() {
     }
 }
 
-export function attachEventListeners() {
-
-    // Add Task Button
-    if (UI.elements.addTaskBtn) {
-        // Remove old listener if possible (not needed if elements are fresh)
-        // But since we replace innerHTML of main-container, the button is new.
-        UI.elements.addTaskBtn.addEventListener('click', () => UI.openCreateModal());
-    }
-
-    // Close Modals
-    if (UI.elements.closeModal) {
-        UI.elements.closeModal.addEventListener('click', () => UI.closeModals());
-    }
-    if (UI.elements.closeCreateModal) {
-        UI.elements.closeCreateModal.addEventListener('click', () => UI.closeModals());
-    }
-
+export function attachProjectCardListeners(root) {
     // Add Task to Project Buttons (delegation or direct)
-    document.querySelectorAll('.add-task-project-btn').forEach(btn => {
+    root.querySelectorAll('.add-task-project-btn').forEach(btn => {
         btn.addEventListener('click', (e) => {
             e.stopPropagation();
             const projectCard = btn.closest('.project-card');
@@ -81,7 +65,7 @@ export function attachEventListeners() {
     });
 
     // Task Item Click (Edit)
-    document.querySelectorAll('.task-item').forEach(item => {
+    root.querySelectorAll('.task-item').forEach(item => {
         item.addEventListener('click', (e) => {
             if (e.target.closest('button') || e.target.closest('input') || e.target.closest('a')) {
                 return;
@@ -90,6 +74,36 @@ export function attachEventListeners() {
             UI.openEditModal(item);
         });
     });
+}
+
+export async function refreshProjectCards() {
+    // Task changes only touch project cards; reload the page if that fails
+    try {
+        await UI.refreshProjectCards(attachProjectCardListeners);
+    } catch (error) {
+        console.error('Error refreshing project cards:', error);
+        await UI.refreshContent(attachEventListeners);
+    }
+}
+
+export function attachEventListeners() {
+
+    // Add Task Button
+    if (UI.elements.addTaskBtn) {
+        // Remove old listener if possible (not needed if elements are fresh)
+        // But since we replace innerHTML of main-container, the button is new.
+        UI.elements.addTaskBtn.addEventListener('click', () => UI.openCreateModal());
+    }
+
+    // Close Modals
+    if (UI.elements.closeModal) {
+        UI.elements.closeModal.addEventListener('click', () => UI.closeModals());
+    }
+    if (UI.elements.closeCreateModal) {
+        UI.elements.closeCreateModal.addEventListener('click', () => UI.closeModals());
+    }
+
+    attachProjectCardListeners(document);
 
     // Save/Delete
     if (UI.elements.saveBtn) {
@@ -225,7 +239,7 @@ async function handleSaveTask() {
         const data = await API.updateTask(taskId, payload);
         if (data.success) {
             UI.closeModals();
-            await UI.refreshContent(attachEventListeners);
+            await refreshProjectCards();
         } else {
             alert('שגיאה בשמירת המשימה: ' + (data.error || 'Unknown error'));
         }
@@ -272,7 +286,7 @@ async function handleCreateTask() {
         const data = await API.createTask(payload);
         if (data.success) {
             UI.closeModals();
-            await UI.refreshContent(attachEventListeners);
+            await refreshProjectCards();
         } else {
             alert('שגיאה ביצירת המשימה: ' + (data.error || 'Unknown error'));
         }
@@ -289,7 +303,7 @@ async function handleDeleteTask() {
         const data = await API.deleteTask(taskId);
         if (data.success) {
             UI.closeModals();
-            await UI.refreshContent(attachEventListeners);
+            await refreshProjectCards();
         } else {
             alert('שגיאה במחיקת המשימה');
         }
@@ -3,23 +3,34 @@ import * as API from './api.js';
 import * as UI from './ui.js';
 import * as Events from './events.js';
 import * as Utils from './utils.js';
-import { state, setTeams, setMembers, setLastUpdateTimestamp, setActiveTeamFilter } from './state.js';
+import { state, setTeams, setMembers, setDataVersion, setActiveTeamFilter, setStreamVersion, setChangeCursor, applyRowChanges } from './state.js';
+
+const REFRESH_DEBOUNCE_MS = 300;
+const VERSION_POLL_MS = 10000;
+const STREAM_RETRY_MS = 5 * 60 * 1000;
+let refreshTimer = null;
+let refreshFull = false;
+let syncQueue = Promise.resolve();
 
 async function init() {
     UI.updateDOMElements();
     UI.initializeFlatpickr();
 
     // Load Initial Data
-    const [teams, members, versionData] = await Promise.all([
+    const [teams, members, versionData, changeHead] = await Promise.all([
         API.fetchTeams(),
         API.fetchMembers(),
-        API.fetchVersion()
+        API.fetchVersion(),
+        API.fetchChanges(null)
     ]);
 
     setTeams(teams);
     setMembers(members);
+    if (changeHead) setChangeCursor(changeHead.cursor);
     if (versionData) {
-        setLastUpdateTimestamp(versionData.timestamp);
+        setDataVersion(versionData.version);
+        // Anything committed between page render and subscribing shows up in 'hello'
+        setStreamVersion(versionData.version);
     }
 
     UI.populateDropdowns();
@@ -27,8 +38,8 @@ async function init() {
     Events.attachEventListeners();
     Events.attachGlobalListeners();
 
-    // Start polling
-    setInterval(checkForUpdates, 5000);
+    // Refresh only when the server pushes a change notice
+    subscribeToChanges();
 
     // Initial State from URL / LocalStorage
     const urlParams = new URLSearchParams(window.location.search);
@@ -76,5 +87,130 @@ async function init() {
     UI.applyFilters();
 }
 
+function scheduleRefresh(full = true) {
+    // Coalesce bursts of notices (e.g. our own save + the echo) into one
+    // refresh; a full refresh wins over a card update
+    refreshFull = refreshFull || full;
+    clearTimeout(refreshTimer);
+    refreshTimer = setTimeout(runRefresh, REFRESH_DEBOUNCE_MS);
+}
+
+async function runRefresh() {
+    const full = refreshFull;
+    refreshFull = false;
+    if (full) await UI.refreshContent(Events.attachEventListeners);
+    else await Events.refreshProjectCards();
+}
+
+async function syncChanges() {
+    // Pull the row delta since our cursor and keep teams/members state
+    // current. Task changes only re-fetch the project cards that changed;
+    // team/member changes (navbar, avatars) and resets reload the page.
+    let needsRefresh = false;
+    let needsFullRefresh = false;
+    let more = true;
+    while (more) {
+        const delta = await API.fetchChanges(state.changeCursor);
+        if (!delta) {
+            scheduleRefresh();
+            return;
+        }
+        setChangeCursor(delta.cursor);
+        more = delta.more;
+
+        if (delta.reset || delta.reload.includes('teams') || delta.reload.includes('members')) {
+            const [teams, members] = await Promise.all([API.fetchTeams(), API.fetchMembers()]);
+            setTeams(teams);
+            setMembers(members);
+            needsFullRefresh = true;
+            if (delta.reset) break;
+        }
+        if (delta.reload.length > 0) needsRefresh = true;
+
+        const byTable = { teams: [], members: [] };
+        delta.changes.forEach(change => {
+            if (byTable[change.table]) byTable[change.table].push(change);
+            else if (change.table === 'tasks') needsRefresh = true;
+        });
+        if (byTable.teams.length) applyRowChanges('teams', byTable.teams);
+        if (byTable.members.length) applyRowChanges('members', byTable.members);
+        if (byTable.teams.length || byTable.members.length) needsFullRefresh = true;
+    }
+    if (needsFullRefresh) scheduleRefresh(true);
+    else if (needsRefresh) scheduleRefresh(false);
+}
+
+function queueSync() {
+    // Serialize delta fetches so each one starts from the previous cursor
+    syncQueue = syncQueue.then(syncChanges).catch(error => {
+        console.error('Error syncing changes:', error);
+        scheduleRefresh();
+    });
+}
+
+function subscribeToChanges() {
+    if (!window.EventSource) {
+        longPollChanges();
+        return;
+    }
+
+    const source = new EventSource('/api/stream');
+    source.addEventListener('hello', (e) => {
+        const data = JSON.parse(e.data);
+        // A reconnect that skipped notices means we may be stale
+        if (state.streamVersion !== null && data.version !== state.streamVersion) queueSync();
+        setStreamVersion(data.version);
+    });
+    source.addEventListener('change', (e) => {
+        const data = JSON.parse(e.data);
+        setStreamVersion(data.version);
+        setDataVersion(data.version);
+        queueSync();
+    });
+    source.addEventListener('reset', (e) => {
+        setStreamVersion(JSON.parse(e.data).version);
+        scheduleRefresh();
+    });
+    source.onerror = () => {
+        // EventSource keeps reconnecting after network errors, but gives up
+        // on 204 (the server has no stream slot for us) or an error status
+        if (source.readyState === EventSource.CLOSED) pollVersion();
+    };
+}
+
+async function pollVersion() {
+    // Without a stream, check the data version now and then; retry the
+    // stream later, when a slot may have freed up
+    const until = Date.now() + STREAM_RETRY_MS;
+    while (Date.now() < until) {
+        await new Promise(resolve => setTimeout(resolve, VERSION_POLL_MS));
+        const data = await API.fetchVersion();
+        if (data && data.version !== state.dataVersion) {
+            setDataVersion(data.version);
+            queueSync();
+        }
+    }
+    subscribeToChanges();
+}
+
+async function longPollChanges() {
+    let version = state.streamVersion;
+    while (true) {
+        try {
+            const data = await API.pollChanges(version === null ? '' : version);
+            if (data.busy) {
+                await pollVersion();
+                return;
+            }
+            if (version !== null && (data.reset || data.changes.length > 0)) queueSync();
+            version = data.version;
+            setStreamVersion(version);
+        } catch (error) {
+            console.error('Error polling for changes:', error);
+            await new Promise(resolve => setTimeout(resolve, 5000));
+        }
+    }
+}
+
 // Run init when DOM is ready
 document.addEventListener('DOMContentLoaded', init);
@@ -9,7 +9,9 @@ export const state = {
     statusFilter: 'all',
     priorityFilter: 'all',
     searchTimeout: null,
-    lastUpdateTimestamp: 0
+    dataVersion: 0,
+    streamVersion: null,
+    changeCursor: null
 };
 
 export function setTeams(newTeams) {
@@ -40,6 +42,24 @@ export function setPriorityFilter(filter) {
     state.priorityFilter = filter;
 }
 
-export function setLastUpdateTimestamp(ts) {
-    state.lastUpdateTimestamp = ts;
+export function setDataVersion(version) {
+    state.dataVersion = version;
+}
+
+export function setStreamVersion(version) {
+    state.streamVersion = version;
+}
+
+export function setChangeCursor(cursor) {
+    state.changeCursor = cursor;
+}
+
+// Apply row deltas from /api/changes to a state list ('teams' or 'members')
+export function applyRowChanges(key, changes) {
+    const rows = new Map(state[key].map(row => [row.id, row]));
+    changes.forEach(change => {
+        if (change.op === 'delete') rows.delete(change.id);
+        else rows.set(change.id, change.row);
+    });
+    state[key] = Array.from(rows.values()).sort((a, b) => a.id - b.id);
 }
@@ -252,6 +252,60 @@ function makeEditable(cell) {
     });
 }
 
+// Cell edits are coalesced per task and sent together to /api/tasks/batch
+// (one transaction) shortly after the last edit, instead of one PUT each.
+const BATCH_DELAY_MS = 400;
+const pendingEdits = new Map(); // taskId -> {field: value}
+let batchTimer = null;
+
+function queueTaskEdit(taskId, field, value) {
+    const id = parseInt(taskId);
+    if (!pendingEdits.has(id)) pendingEdits.set(id, {});
+    pendingEdits.get(id)[field] = value;
+    clearTimeout(batchTimer);
+    batchTimer = setTimeout(() => flushTaskEdits(), BATCH_DELAY_MS);
+}
+
+function takePendingOperations() {
+    clearTimeout(batchTimer);
+    batchTimer = null;
+    const operations = [];
+    pendingEdits.forEach((data, id) => operations.push({ op: 'update', id: id, data: data }));
+    pendingEdits.clear();
+    return operations;
+}
+
+function sendBatch(operations) {
+    return fetch('/api/tasks/batch', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ operations: operations })
+    }).then(res => res.json());
+}
+
+// Send pending edits plus extraOps; resolves to the results of extraOps
+function flushTaskEdits(extraOps = []) {
+    const edits = takePendingOperations();
+    const operations = edits.concat(extraOps);
+    if (operations.length === 0) return Promise.resolve([]);
+
+    return sendBatch(operations).then(data => {
+        if (!data.results) throw new Error(data.error || 'Unknown error');
+        if (data.results.slice(0, edits.length).some(result => !result.success)) {
+            alert('Error saving');
+        }
+        return data.results.slice(edits.length);
+    });
+}
+
+// Don't lose edits still waiting for the timer when the page goes away
+window.addEventListener('pagehide', () => {
+    const operations = takePendingOperations();
+    if (operations.length === 0) return;
+    const body = new Blob([JSON.stringify({ operations: operations })], { type: 'application/json' });
+    navigator.sendBeacon('/api/tasks/batch', body);
+});
+
 function saveCell(cell, newValue, taskId, field) {
     const task = initialTasks.find(t => t.id == taskId);
     let apiValue = newValue;
@@ -283,21 +337,8 @@ function saveCell(cell, newValue, taskId, field) {
     }
     else cell.innerText = newValue;
 
-    // Send to API
-    const payload = {};
-    payload[field] = apiValue;
-
-    fetch(`/api/tasks/${taskId}`, {
-        method: 'PUT',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-    }).then(res => res.json())
-        .then(data => {
-            if (!data.success) {
-                alert('Error saving');
-                // Revert?
-            }
-        });
+    // Queue for the next batch
+    queueTaskEdit(taskId, field, apiValue);
 }
 
 // Add New Task (Standalone Form)
@@ -360,12 +401,8 @@ document.querySelectorAll('.btn-add-task-submit').forEach(btn => {
 
             console.log("Submitting Payload", payload);
 
-            fetch('/api/tasks', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify(payload)
-            }).then(res => res.json())
-                .then(data => {
+            flushTaskEdits([{ op: 'create', data: payload }])
+                .then(([data]) => {
                     if (data.success) {
                         // Add id to payload and PREPEND to local list (unshift)
                         payload.id = data.id;
@@ -403,10 +440,10 @@ document.querySelectorAll('.btn-add-task-submit').forEach(btn => {
 function deleteTask(id) {
     if (!confirm('האם אתה בטוח שברצונך למחוק משימה זו?')) return;
 
-    fetch(`/api/tasks/${id}`, {
-        method: 'DELETE'
-    }).then(res => res.json())
-        .then(data => {
+    // Pending edits of this task are moot
+    pendingEdits.delete(parseInt(id));
+    flushTaskEdits([{ op: 'delete', id: parseInt(id) }])
+        .then(([data]) => {
             if (data.success) {
                 const idx = initialTasks.findIndex(t => t.id == id);
                 if (idx > -1) initialTasks.splice(idx, 1);
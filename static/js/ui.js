@@ -1,7 +1,7 @@
 // UI Manipulation
 import { state } from './state.js';
 import { formatDateFromISO, getStatusFromClass, getFlatpickrConfig } from './utils.js';
-import { fetchPageContent } from './api.js';
+import { fetchPageContent, fetchProjectCards } from './api.js';
 
 // DOM Elements Cache
 export const elements = {};
@@ -321,6 +321,27 @@ function updateFilterValidationUI() {
     }
 }
 
+export async function refreshProjectCards(attachCardListeners) {
+    // Replace only the project cards whose fragment key changed; unchanged
+    // cards stay in the DOM with their listeners
+    const grid = document.querySelector('.projects-grid');
+    if (!grid) return;
+    const current = new Map();
+    grid.querySelectorAll('.project-card').forEach(card => current.set(card.dataset.fragmentKey, card));
+
+    const data = await fetchProjectCards(Array.from(current.keys()));
+    const template = document.createElement('template');
+    const cards = data.cards.map(card => {
+        if (card.html === null) return current.get(card.key);
+        template.innerHTML = card.html;
+        const element = template.content.firstElementChild;
+        attachCardListeners(element);
+        return element;
+    });
+    grid.replaceChildren(...cards);
+    applyFilters();
+}
+
 export async function refreshContent(attachedListenersCallback) {
     try {
         const activeElement = document.activeElement;
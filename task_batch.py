@@ -0,0 +1,211 @@
+"""Batched task mutations (POST /api/tasks/batch).
+
+A batch is a list of operations:
+
+    {"op": "create", "data": {...}}
+    {"op": "update", "id": 42, "data": {"status": "status-done"}}
+    {"op": "archive", "id": 42}      (and "unarchive")
+    {"op": "delete", "id": 42}
+
+Every operation is validated first and gets its own result; invalid ones
+are skipped, the rest are written with a handful of bulk statements in the
+caller's transaction (one commit, one fsync). Operations on the same task
+apply in order: later updates win, and nothing can follow a delete.
+Archiving or unarchiving (also via "is_archived" in an update) moves the
+task between the active and archive tables after its other changes.
+"""
+from datetime import datetime
+
+from sqlalchemy import select, insert, update, delete
+
+from models import Task, ArchivedTask, TaskMember, split_members
+from changes import mark_changed
+from archive import TASK_MODELS, move_tasks
+
+MAX_BATCH_OPERATIONS = 1000
+BATCH_OPS = ('create', 'update', 'archive', 'unarchive', 'delete')
+
+DEFAULT_PROJECT = "ללא פרויקט"
+DEFAULT_TASK = "ללא שם"
+DEFAULT_STATUS = 'status-notstarted'
+
+
+class BatchItemError(ValueError):
+    pass
+
+
+def _date(value, name):
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).date()
+    except (TypeError, ValueError):
+        raise BatchItemError(f'Invalid {name} format')
+
+
+def _members(value):
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return ','.join(split_members(value))
+    if isinstance(value, list) and all(isinstance(name, str) for name in value):
+        return ','.join(value)
+    raise BatchItemError('members must be a list of names')
+
+
+def _number(value, name, cast):
+    if value in (None, ''):
+        return None
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise BatchItemError(f'{name} must be a number')
+
+
+def task_values(data):
+    """Column values for the task fields present in data"""
+    if not isinstance(data, dict):
+        raise BatchItemError('data must be an object')
+    values = {}
+    for key in ('project', 'task', 'status', 'priority', 'notes'):
+        if key in data:
+            if not isinstance(data[key], str) and not (key == 'notes' and data[key] is None):
+                raise BatchItemError(f'{key} must be text')
+            values[key] = data[key]
+    if 'members' in data:
+        values['members'] = _members(data['members'])
+    if 'team_id' in data:
+        values['team_id'] = _number(data['team_id'], 'team_id', int)
+    if 'estimated_hours' in data:
+        values['estimated_hours'] = _number(data['estimated_hours'], 'estimated_hours', float)
+    for key in ('start_date', 'end_date'):
+        if key in data:
+            values[key] = _date(data[key], key)
+    if 'is_archived' in data:
+        values['is_archived'] = bool(data['is_archived'])
+    return values
+
+
+def new_task_values(data):
+    """Full column values for a created task (same defaults as POST /api/tasks)"""
+    values = task_values(data)
+    return {
+        'project': (values.get('project') or '').strip() or DEFAULT_PROJECT,
+        'task': (values.get('task') or '').strip() or DEFAULT_TASK,
+        'members': values.get('members', ''),
+        'status': values.get('status') or DEFAULT_STATUS,
+        'priority': values.get('priority') or 'none',
+        'notes': values.get('notes') or '',
+        'team_id': values.get('team_id'),
+        'start_date': values.get('start_date'),
+        'end_date': values.get('end_date'),
+        'estimated_hours': values.get('estimated_hours'),
+        'is_archived': False,  # created active, archived by a move
+    }, values.get('is_archived', False)
+
+
+def _task_id(operation):
+    task_id = operation.get('id')
+    if not isinstance(task_id, int) or isinstance(task_id, bool):
+        raise BatchItemError('id is required')
+    return task_id
+
+
+def apply_batch(session, operations):
+    """Apply operations in session's transaction; returns one result per operation"""
+    results = [None] * len(operations)
+    creates = []  # (position, values)
+    planned = []  # (position, op, task id, values)
+
+    for position, operation in enumerate(operations):
+        try:
+            if not isinstance(operation, dict) or operation.get('op') not in BATCH_OPS:
+                raise BatchItemError(f'op must be one of: {", ".join(BATCH_OPS)}')
+            op = operation['op']
+            if op == 'create':
+                values, archived = new_task_values(operation.get('data'))
+                creates.append((position, values, archived))
+            elif op == 'update':
+                planned.append((position, op, _task_id(operation), task_values(operation.get('data'))))
+            elif op in ('archive', 'unarchive'):
+                planned.append((position, 'update', _task_id(operation), {'is_archived': op == 'archive'}))
+            else:
+                planned.append((position, op, _task_id(operation), None))
+        except BatchItemError as e:
+            results[position] = {'success': False, 'error': str(e)}
+
+    # One lookup for every referenced task: id -> its table
+    referenced = {task_id for _, _, task_id, _ in planned}
+    existing = {}
+    for model in TASK_MODELS:
+        if referenced:
+            existing.update((task_id, model) for task_id in
+                            session.execute(select(model.id).where(model.id.in_(referenced))).scalars())
+
+    # Fold operations per task, in order
+    updates, archive_to, deleted = {}, {}, set()
+    for position, op, task_id, values in planned:
+        if task_id not in existing:
+            results[position] = {'success': False, 'id': task_id, 'error': 'Task not found'}
+        elif task_id in deleted:
+            results[position] = {'success': False, 'id': task_id, 'error': 'Task is deleted earlier in this batch'}
+        else:
+            if op == 'delete':
+                deleted.add(task_id)
+                updates.pop(task_id, None)
+                archive_to.pop(task_id, None)
+            else:
+                values = dict(values)
+                if 'is_archived' in values:
+                    archive_to[task_id] = values.pop('is_archived')
+                updates.setdefault(task_id, {}).update(values)
+            results[position] = {'success': True, 'id': task_id}
+    updates = {task_id: values for task_id, values in updates.items() if values}
+
+    created_ids = []
+    if creates:
+        statement = insert(Task.__table__).returning(Task.__table__.c.id, sort_by_parameter_order=True)
+        created_ids = session.execute(statement, [values for _, values, _ in creates]).scalars().all()
+        for (position, _, archived), task_id in zip(creates, created_ids):
+            results[position] = {'success': True, 'id': task_id}
+            if archived:
+                archive_to[task_id] = True
+        existing.update((task_id, Task) for task_id in created_ids)
+
+    # Records of one executemany share their table and keys
+    groups = {}
+    for task_id, values in updates.items():
+        groups.setdefault((existing[task_id], tuple(sorted(values))), []).append({'id': task_id, **values})
+    for (model, _), rows in groups.items():
+        session.execute(update(model), rows)
+
+    # Core statements bypass the ORM event that keeps task_member in sync
+    relinked = {task_id: values['members'] for task_id, values in updates.items() if 'members' in values}
+    stale = list(deleted) + list(relinked)
+    relinked.update((task_id, values['members']) for task_id, (_, values, _) in zip(created_ids, creates))
+    if stale:
+        session.execute(delete(TaskMember).where(TaskMember.task_id.in_(stale)))
+    links = [
+        {'task_id': task_id, 'member_name': name}
+        for task_id, members in relinked.items()
+        for name in split_members(members)
+    ]
+    if links:
+        session.execute(insert(TaskMember), links)
+
+    if deleted:
+        for model in TASK_MODELS:
+            session.execute(delete(model).where(model.id.in_(deleted)))
+
+    if created_ids:
+        mark_changed(session, 'tasks', 'insert', created_ids)
+    if updates:
+        mark_changed(session, 'tasks', 'update', updates)
+    if deleted:
+        mark_changed(session, 'tasks', 'delete', deleted)
+
+    # Archive state changes move rows between the tables, after their updates
+    for archive in (True, False):
+        move_tasks(session, [task_id for task_id, target in archive_to.items()
+                             if target == archive and (existing[task_id] is ArchivedTask) != archive], archive)
+    return results
@@ -0,0 +1,37 @@
+"""Shared fixtures: an app on a fresh in-memory database.
+
+Run from the repository root:
+
+    python -m pytest
+"""
+import os
+import sys
+
+import pytest
+
+# The app modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from migrations import upgrade_database
+from models import db
+
+
+@pytest.fixture
+def app_config():
+    """Extra app config; a test module overrides this fixture to change it"""
+    return {}
+
+
+@pytest.fixture
+def app(app_config):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True, **app_config})
+    with app.app_context():
+        upgrade_database()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
@@ -0,0 +1,60 @@
+"""Test data and SQL recording helpers"""
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event
+
+from models import db, Team, TeamMember, Task
+
+
+@contextmanager
+def recorded_statements():
+    """Collect (statement, parameters) of every SQL statement run inside the block"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+def add_teams(count=2, members_per_team=2):
+    """Teams named team0.. with members member<team>_<n>; returns the teams"""
+    teams = [Team(name_en=f'team{t}', name_he=f'team{t}') for t in range(count)]
+    db.session.add_all(teams)
+    db.session.flush()
+    for t, team in enumerate(teams):
+        for n in range(members_per_team):
+            db.session.add(TeamMember(team_id=team.id, name_en=f'member{t}_{n}', name_he=f'member{t}_{n}'))
+    db.session.commit()
+    return teams
+
+
+def add_tasks(teams, projects, per_project=3, start=date(2026, 1, 5)):
+    """per_project tasks in each of `projects` projects, spread over the teams"""
+    for p in range(projects):
+        for n in range(per_project):
+            team = teams[(p + n) % len(teams)]
+            db.session.add(Task(
+                project=f'project{p:03d}', task=f'task {p}-{n}', members=f'member{(p + n) % len(teams)}_0',
+                status='status-inprogress', priority='medium', team_id=team.id,
+                start_date=start, end_date=start,
+            ))
+    db.session.commit()
+
+
+def explain(statement, parameters=()):
+    """EXPLAIN QUERY PLAN detail lines of a driver-level statement"""
+    rows = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+    return [row[-1] for row in rows]
+
+
+def query_plan(query):
+    """EXPLAIN QUERY PLAN detail lines of the statement an ORM query runs"""
+    with recorded_statements() as statements:
+        query.all()
+    return explain(*statements[0])
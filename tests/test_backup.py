@@ -0,0 +1,50 @@
+"""Full restores replace the data, even with an empty backup."""
+import io
+import json
+from datetime import datetime, timedelta
+
+from models import db, Task, Team
+from bulk_archive import count_matching
+from tests.helpers import add_teams, add_tasks
+
+
+def restore(client, backup, table='all'):
+    data = {'file': (io.BytesIO(json.dumps(backup).encode()), 'backup.json')}
+    return client.post(f'/api/restore/{table}', data=data, content_type='multipart/form-data')
+
+
+def test_empty_full_restore_wipes_data(app, client):
+    add_tasks(add_teams(), projects=2)
+    response = restore(client, {'table': 'all', 'data': {}})
+    assert response.status_code == 200, response.get_json()
+    assert Task.query.count() == 0
+    assert Team.query.count() == 0
+
+
+def test_full_restore_without_data_is_rejected(app, client):
+    add_tasks(add_teams(), projects=2)
+    response = restore(client, {'table': 'all'})
+    assert response.status_code == 400
+    assert Task.query.count() == 6
+
+
+def test_restore_keeps_the_idle_clock(app, client):
+    add_tasks(add_teams(), projects=1)
+    for task in Task.query:
+        task.status = 'status-done'
+    db.session.commit()
+    db.session.execute(Task.__table__.update().values(edited_at=datetime.utcnow() - timedelta(days=60)))
+    db.session.commit()
+    idle = {'status': 'status-done', 'idle_days': 30}
+    assert count_matching(db.session, idle, True) == 3
+
+    backup = client.get('/api/backup/all').get_json()
+    assert restore(client, backup).status_code == 200
+    assert count_matching(db.session, idle, True) == 3
+
+    task_id = Task.query.first().id
+    client.put(f'/api/tasks/{task_id}', json={'is_archived': True})
+    client.put(f'/api/tasks/{task_id}', json={'is_archived': False})
+    assert count_matching(db.session, idle, True) == 3
+    client.put(f'/api/tasks/{task_id}', json={'notes': 'still going'})
+    assert count_matching(db.session, idle, True) == 2
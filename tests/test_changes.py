@@ -0,0 +1,13 @@
+"""The change log delta always advances a client that follows `more`."""
+import pytest
+
+from tests.helpers import add_teams, add_tasks
+
+
+@pytest.mark.parametrize('limit', [0, -5, 1])
+def test_changes_limit_is_at_least_one(app, client, limit):
+    add_tasks(add_teams(), projects=1)
+    data = client.get(f'/api/changes?since=0&limit={limit}').get_json()
+    assert data['more']
+    assert data['cursor'] == 1
+    assert len(data['changes']) >= 1
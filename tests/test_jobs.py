@@ -0,0 +1,63 @@
+"""Running jobs whose worker died are taken over by the next reader."""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+import bulk_archive
+from models import db, Job, Task, ArchivedTask
+from tests.helpers import add_teams, add_tasks
+
+
+@pytest.fixture
+def resumed(monkeypatch):
+    """Job ids handed to a background thread (not started in tests)"""
+    job_ids = []
+    monkeypatch.setattr(bulk_archive, '_run_in_background', lambda app, job_id: job_ids.append(job_id))
+    return job_ids
+
+
+def add_job(kind='archive', heartbeat_age=timedelta(0)):
+    job = Job(kind=kind, params=json.dumps({'filter': {'project': 'project000'}, 'archive': True}),
+              updated_at=datetime.utcnow() - heartbeat_age)
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def test_live_job_is_left_alone(app, client, resumed):
+    job = add_job(heartbeat_age=timedelta(seconds=5))
+    assert client.get(f'/api/jobs/{job.id}').get_json()['status'] == 'running'
+    assert resumed == []
+
+
+def test_stale_archive_job_resumes(app, client, resumed):
+    add_tasks(add_teams(), projects=2)
+    job = add_job(heartbeat_age=bulk_archive.JOB_STALE_AFTER * 2)
+
+    assert client.get(f'/api/jobs/{job.id}').get_json()['status'] == 'running'
+    assert client.get(f'/api/jobs/{job.id}').status_code == 200
+    assert resumed == [job.id]  # claimed once, the heartbeat is fresh again
+
+    bulk_archive.run_archive_job(app, job.id)
+    db.session.expire_all()
+    assert client.get(f'/api/jobs/{job.id}').get_json()['status'] == 'done'
+    assert ArchivedTask.query.count() == 3
+    assert Task.query.filter_by(project='project000').count() == 0
+
+
+def test_stale_job_without_heartbeat_resumes(app, client, resumed):
+    job = add_job(heartbeat_age=bulk_archive.JOB_STALE_AFTER * 2)
+    job.updated_at = None  # created before the heartbeat column existed
+    job.created_at = datetime.utcnow() - bulk_archive.JOB_STALE_AFTER * 2
+    db.session.commit()
+    client.get(f'/api/jobs/{job.id}')
+    assert resumed == [job.id]
+
+
+def test_stale_auto_archive_job_fails(app, client, resumed):
+    job = add_job(kind='auto_archive', heartbeat_age=bulk_archive.JOB_STALE_AFTER * 2)
+    data = client.get(f'/api/jobs/{job.id}').get_json()
+    assert data['status'] == 'failed'
+    assert data['error'] and data['finished_at']
+    assert resumed == []
@@ -0,0 +1,52 @@
+"""The board and list endpoints run a fixed number of queries, however
+many projects and tasks there are (no per-project or per-task lookups)."""
+import pytest
+
+from models import db, Task
+from archive import move_tasks
+from fragments import init_fragment_cache
+from tests.helpers import recorded_statements, add_teams, add_tasks
+
+URLS = [
+    '/',
+    '/?team=1',
+    '/?mode=archive',
+    '/print',
+    '/table-editor',
+    '/api/archive',
+    '/api/calendar/range?start=2026-01-01&end=2026-01-31',
+    '/api/calendar/range?start=2026-01-01&end=2026-01-31&team_id=1',
+    '/api/calendar/workload?start_date=2026-01-01&end_date=2026-01-31',
+    '/api/teams',
+    '/api/members',
+]
+
+
+def archive_some():
+    """Archive a third of the tasks so the archive views have rows too"""
+    ids = db.session.scalars(db.select(Task.id).where(Task.id % 3 == 0)).all()
+    move_tasks(db.session, ids, True)
+    db.session.commit()
+
+
+def count_queries(app, client, url):
+    client.get(url)  # Reference data cache warm-up
+    init_fragment_cache(app)  # Render every project section again
+    with recorded_statements() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize('url', URLS)
+def test_query_count_does_not_grow_with_projects(app, client, url):
+    teams = add_teams()
+    add_tasks(teams, projects=3)
+    archive_some()
+    few = count_queries(app, client, url)
+
+    add_tasks(teams, projects=40, per_project=5)
+    archive_some()
+    many = count_queries(app, client, url)
+
+    assert many == few
@@ -0,0 +1,79 @@
+"""The calendar and dashboard filters are answered by index searches."""
+from datetime import date
+
+import pytest
+
+from models import Task, ArchivedTask
+from calendar_range import overlapping, tasks_in_range
+from tests.helpers import add_teams, add_tasks, explain, query_plan, recorded_statements
+
+START, END = date(2026, 1, 1), date(2026, 1, 31)
+
+
+def uses_index(plan, index):
+    return any(line.startswith('SEARCH') and index in line for line in plan)
+
+
+def test_overlap_uses_span_index(app):
+    add_tasks(add_teams(), projects=20)
+    plan = query_plan(Task.query.filter(overlapping(START, END)))
+    assert uses_index(plan, 'ix_task_span'), plan
+
+
+def test_archive_overlap_uses_archive_span_index(app):
+    plan = query_plan(ArchivedTask.query.filter(overlapping(START, END, ArchivedTask)))
+    assert uses_index(plan, 'ix_archived_task_span'), plan
+
+
+def test_team_range_uses_span_index(app):
+    teams = add_teams()
+    add_tasks(teams, projects=20)
+    plan = query_plan(tasks_in_range(START, END, teams[0].id))
+    assert uses_index(plan, 'ix_task_span'), plan
+
+
+def test_team_filter_uses_team_index(app):
+    plan = query_plan(Task.query.filter(Task.team_id == 1))
+    assert uses_index(plan, 'ix_task_team'), plan
+
+
+def test_project_filter_uses_project_index(app):
+    plan = query_plan(Task.query.filter(Task.project == 'project001'))
+    assert uses_index(plan, 'ix_task_project'), plan
+
+
+CALENDAR_URLS = [
+    '/api/calendar/range?start=2026-01-01&end=2026-01-31',
+    '/api/calendar/range?start=2026-01-01&end=2026-01-31&team_id=1',
+    '/api/calendar/week?date=2026-01-05',
+    '/api/calendar/month?year=2026&month=1',
+]
+
+
+@pytest.mark.parametrize('paging', ['', '&limit=5'])
+@pytest.mark.parametrize('url', CALENDAR_URLS)
+def test_calendar_endpoints_use_span_index(app, client, url, paging):
+    add_tasks(add_teams(), projects=20)
+    with recorded_statements() as statements:
+        assert client.get(url + paging).status_code == 200
+    task_selects = [(statement, parameters) for statement, parameters in statements
+                    if statement.startswith('SELECT') and 'FROM task' in statement]
+    assert task_selects
+    for statement, parameters in task_selects:
+        plan = explain(statement, parameters)
+        assert uses_index(plan, 'ix_task_span'), plan
+        assert 'SCAN task' not in plan, plan
+
+
+def test_calendar_pages_cover_the_range(app, client):
+    add_tasks(add_teams(), projects=4)
+    url = '/api/calendar/range?start=2026-01-01&end=2026-01-31'
+    everything = [task['id'] for task in client.get(url).get_json()['tasks']]
+    paged, cursor = [], ''
+    while True:
+        response = client.get(f'{url}&limit=5&fields=id&cursor={cursor}')
+        paged += [task['id'] for task in response.get_json()['tasks']]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+    assert paged == sorted(everything)
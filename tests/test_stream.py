@@ -0,0 +1,27 @@
+"""Change stream slots are always handed back."""
+import pytest
+
+import routes.stream as stream
+from routes.stream import stream_slots
+
+
+@pytest.fixture(autouse=True)
+def no_watcher(monkeypatch):
+    monkeypatch.setattr(stream.broadcaster, 'start_watcher', lambda app, interval: None)
+
+
+def test_stream_releases_slot_on_close(app, client):
+    response = client.get('/api/stream')
+    assert response.status_code == 200
+    assert stream_slots.open == 1
+    response.close()
+    assert stream_slots.open == 0
+
+
+def test_stream_releases_slot_when_setup_fails(app, client, monkeypatch):
+    def broken(generator):
+        raise RuntimeError('broken')
+    monkeypatch.setattr(stream, 'stream_with_context', broken)
+    with pytest.raises(RuntimeError):
+        client.get('/api/stream')
+    assert stream_slots.open == 0
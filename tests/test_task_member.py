@@ -0,0 +1,68 @@
+"""task_member links follow tasks in and out of the archive table."""
+import pytest
+from sqlalchemy import text
+
+from models import db, Task, TaskMember
+from migrations import drop_task_member_foreign_key
+from tests.helpers import add_teams, add_tasks, recorded_statements
+
+
+@pytest.fixture
+def app_config():
+    return {'SQLITE_PRAGMAS': {'foreign_keys': 'ON'}}
+
+
+def links(task_id):
+    return sorted(db.session.execute(
+        text('SELECT member_name FROM task_member WHERE task_id = :id'), {'id': task_id}
+    ).scalars())
+
+
+def test_archive_round_trip_keeps_links(app, client):
+    add_tasks(add_teams(), projects=1, per_project=1)
+    task = Task.query.one()
+    members = links(task.id)
+    assert members
+    assert db.session.execute(text('PRAGMA foreign_keys')).scalar() == 1
+
+    assert client.put(f'/api/tasks/{task.id}', json={'is_archived': True}).status_code == 200
+    assert links(task.id) == members
+    assert db.session.execute(text('PRAGMA foreign_key_check')).all() == []
+
+    assert client.put(f'/api/tasks/{task.id}', json={'is_archived': False}).status_code == 200
+    assert links(task.id) == members
+
+
+@pytest.mark.parametrize('archived', [False, True])
+def test_delete_removes_links(app, client, archived):
+    add_tasks(add_teams(), projects=1, per_project=1)
+    task = Task.query.one()
+    if archived:
+        client.put(f'/api/tasks/{task.id}', json={'is_archived': True})
+    assert client.delete(f'/api/tasks/{task.id}').status_code == 200
+    assert links(task.id) == []
+
+
+def test_migration_drops_foreign_key(app):
+    add_tasks(add_teams(), projects=1, per_project=1)
+    with db.engine.begin() as conn:
+        conn.execute(text('DROP TABLE task_member'))
+        conn.execute(text('CREATE TABLE task_member (task_id INTEGER NOT NULL REFERENCES task (id), '
+                          'member_name VARCHAR(100) NOT NULL, PRIMARY KEY (task_id, member_name))'))
+        conn.execute(text("INSERT INTO task_member VALUES (1, 'member0_0')"))
+        drop_task_member_foreign_key(conn)
+        sql = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'task_member'")).scalar()
+        indexes = set(conn.execute(text("SELECT name FROM sqlite_master WHERE tbl_name = 'task_member'")).scalars())
+    assert 'REFERENCES' not in sql.upper()
+    assert 'ix_task_member_member_task' in indexes
+    assert db.session.query(TaskMember.task_id).all() == [(1,)]
+
+
+def test_edit_without_members_keeps_links(app, client):
+    add_tasks(add_teams(), projects=1, per_project=1)
+    task = Task.query.one()
+    members = task.members
+    with recorded_statements() as statements:
+        assert client.put(f'/api/tasks/{task.id}', json={'status': 'status-done'}).status_code == 200
+        assert client.put(f'/api/tasks/{task.id}', json={'members': members.split(',')}).status_code == 200
+    assert not [statement for statement, parameters in statements if 'task_member' in statement]
@@ -0,0 +1,19 @@
+"""Deleting a team detaches its tasks, in and out of the archive."""
+from models import db, Task, ArchivedTask
+from tests.helpers import add_teams, add_tasks
+
+
+def test_delete_team_detaches_archived_tasks(app, client):
+    teams = add_teams(count=1)
+    add_tasks(teams, projects=1, per_project=2)
+    team_id = teams[0].id
+    archived_id = Task.query.order_by(Task.id.desc()).first().id
+    assert client.put(f'/api/tasks/{archived_id}', json={'is_archived': True}).status_code == 200
+
+    assert client.delete(f'/api/teams/{team_id}').status_code == 200
+    response = client.post('/api/teams', json={'name_en': 'new', 'name_he': 'new'})
+    assert response.status_code in (200, 201)
+
+    db.session.expire_all()
+    assert [task.team_id for task in Task.query] == [None]
+    assert [task.team_id for task in ArchivedTask.query] == [None]
@@ -0,0 +1,142 @@
+"""Per-member, per-day workload aggregation.
+
+A task's estimated_hours are shared evenly between its assigned members and
+spread evenly over the working days of its interval (weekends and special
+days other than company events are skipped). Each (task, member) pair is
+added to a difference array over the requested window, so the whole
+aggregation is one pass over the tasks plus one prefix sum per member.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from models import SpecialDay, split_members
+from reference import reference_data
+
+# Python weekday() numbers of the weekend (Friday, Saturday)
+WEEKEND = (4, 5)
+# Special day types that are still working days
+WORKING_SPECIAL_DAY_TYPES = ('company_event',)
+
+
+def workload_members(team_id, tasks):
+    """Members shown in a workload view (member dicts, by team then id).
+
+    For a team: its members plus anyone assigned to one of the team's
+    tasks. Otherwise (all teams, or archive): every member.
+    """
+    members = reference_data().members_by_team()
+    if not team_id or team_id == 'archive':
+        return members
+
+    try:
+        team_id = int(team_id)
+    except ValueError:
+        return []
+    relevant_names = {m['name_en'] for m in members if m['team_id'] == team_id}
+    for task in tasks:
+        relevant_names.update(split_members(task.members))
+    return [m for m in members if m['team_id'] == team_id or m['name_en'] in relevant_names]
+
+
+def non_working_days(start, end):
+    """Sorted ordinals of weekday special days that are not worked"""
+    days = SpecialDay.query.filter(
+        SpecialDay.date.between(start, end),
+        SpecialDay.type.notin_(WORKING_SPECIAL_DAY_TYPES)
+    ).all()
+    return sorted({d.date.toordinal() for d in days if d.date.weekday() not in WEEKEND})
+
+
+def _weekend_days(first, last):
+    """Number of weekend days between two ordinals (inclusive)"""
+    total = last - first + 1
+    full_weeks, remainder = divmod(total, 7)
+    count = full_weeks * len(WEEKEND)
+    first_weekday = date.fromordinal(first).weekday()
+    count += sum(1 for i in range(remainder) if (first_weekday + i) % 7 in WEEKEND)
+    return count
+
+
+def _working_days(first, last, holidays):
+    holidays_inside = bisect_right(holidays, last) - bisect_left(holidays, first)
+    return (last - first + 1) - _weekend_days(first, last) - holidays_inside
+
+
+def task_span(task):
+    """(first, last) ordinals of the days a task occupies, or None"""
+    first = task.start_date or task.end_date
+    last = task.end_date or task.start_date
+    if first is None:
+        return None
+    first, last = first.toordinal(), last.toordinal()
+    return first, max(first, last)
+
+
+def compute_workload(tasks, members, start, end):
+    """Dense workload matrices for members x days in [start, end].
+
+    Returns (days, working, hours, counts): ISO day strings, a 0/1 working
+    day mask, allocated hours per member per day, and the number of tasks
+    each member has running on each day.
+    """
+    base = start.toordinal()
+    n_days = end.toordinal() - base + 1
+
+    spans = {task.id: task_span(task) for task in tasks}
+    known = [span for span in spans.values() if span]
+    holidays = non_working_days(
+        date.fromordinal(min([s[0] for s in known] + [base])),
+        date.fromordinal(max([s[1] for s in known] + [base + n_days - 1]))
+    )
+    holiday_set = set(holidays)
+
+    rows = {}
+    for i, member in enumerate(members):
+        rows.setdefault(member['name_en'], []).append(i)
+
+    hours_diff = [[0.0] * (n_days + 1) for _ in members]
+    count_diff = [[0] * (n_days + 1) for _ in members]
+
+    for task in tasks:
+        span = spans[task.id]
+        names = split_members(task.members)
+        targets = [i for name in names for i in rows.get(name, ())]
+        if not span or not targets:
+            continue
+        lo = max(span[0], base) - base
+        hi = min(span[1], base + n_days - 1) - base
+        if lo > hi:
+            continue
+
+        rate = 0.0
+        if task.estimated_hours:
+            days = _working_days(span[0], span[1], holidays)
+            if days:
+                rate = task.estimated_hours / len(names) / days
+
+        for i in targets:
+            hours_diff[i][lo] += rate
+            hours_diff[i][hi + 1] -= rate
+            count_diff[i][lo] += 1
+            count_diff[i][hi + 1] -= 1
+
+    day_ordinals = range(base, base + n_days)
+    working = [
+        0 if (date.fromordinal(o).weekday() in WEEKEND or o in holiday_set) else 1
+        for o in day_ordinals
+    ]
+
+    hours, counts = [], []
+    for i in range(len(members)):
+        running_hours, running_count = 0.0, 0
+        member_hours, member_counts = [], []
+        for d in range(n_days):
+            running_hours += hours_diff[i][d]
+            running_count += count_diff[i][d]
+            member_hours.append(round(running_hours, 2) if working[d] else 0)
+            member_counts.append(running_count)
+        hours.append(member_hours)
+        counts.append(member_counts)
+
+    days = [date.fromordinal(o).isoformat() for o in day_ordinals]
+    return days, working, hours, counts